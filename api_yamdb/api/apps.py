@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from api_yamdb.db.health import connect_health_checks
+
+        from . import checks  # noqa: F401
+        from .signals import connect_catalog_signals, connect_principal_signals
+        connect_catalog_signals()
+        connect_principal_signals()
+        connect_health_checks()
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from reviews.models import User
+
+# Всё, что нужно аутентификации и проверкам прав. Порядок — как
+# в модели: его ожидает Model.from_db для частично загруженных строк.
+PRINCIPAL_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in ('id', 'username', 'role', 'is_staff', 'is_active')
+)
+
+
+class PrincipalCache:
+    """LRU-кэш полей пользователя в памяти процесса с ограничением по TTL.
+
+    Сигналы User сбрасывают запись только в своём процессе, поэтому
+    в остальных изменения роли видны не позже чем через TTL.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return values
+
+    def set(self, user_id, values):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.ttl, values)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+principals = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+)
+
+
+def load_principal(user_id):
+    """Пользователь с загруженными PRINCIPAL_FIELDS, остальные отложены.
+
+    Отложенные поля догружаются при обращении, а save() такого
+    объекта сохраняет только загруженные поля.
+    """
+    values = principals.get(user_id)
+    if values is None:
+        values = (
+            User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values_list(*PRINCIPAL_FIELDS)
+            .first()
+        )
+        if values is None:
+            return None
+        principals.set(user_id, values)
+    return User.from_db(
+        router.db_for_read(User), PRINCIPAL_FIELDS, values
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication без запроса к БД при тёплом кэше пользователей."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        user = load_principal(user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
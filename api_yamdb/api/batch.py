@@ -0,0 +1,172 @@
+from django.db import connection, transaction
+from rest_framework import status
+from reviews.changes import log_changes
+from reviews.models import Change, Comment, Review, Title
+from reviews.ratings import record_review_events
+
+from .cache import bump_version_on_commit
+from .serializers import (CommentBatchItemSerializer, CommentSerializer,
+                          ReviewBatchItemSerializer, ReviewSerializer)
+
+
+class BatchCreate:
+    """Создание пачки объектов: проверки одним запросом на пачку.
+
+    Невалидные элементы не мешают остальным: для каждого элемента
+    возвращается свой статус и либо созданный объект, либо ошибки.
+    Автор всех объектов — пользователь запроса, как и у одиночных
+    эндпоинтов.
+    """
+    model = None
+    parent_model = None
+    parent_field = None
+    item_serializer_class = None
+    serializer_class = None
+
+    def __init__(self, user):
+        self.user = user
+        self.results = []
+
+    def error(self, index, errors):
+        self.results[index] = {
+            'status': status.HTTP_400_BAD_REQUEST,
+            'errors': errors,
+        }
+
+    def validate_items(self, items):
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = self.item_serializer_class(data=item)
+            if serializer.is_valid():
+                valid[index] = {
+                    **serializer.validated_data, 'author': self.user,
+                }
+            else:
+                self.error(index, serializer.errors)
+        return valid
+
+    def resolve_parents(self, valid):
+        ids = {data[self.parent_field] for data in valid.values()}
+        existing = set(
+            self.parent_model.objects.filter(pk__in=ids)
+            .values_list('pk', flat=True)
+        )
+        for index, data in list(valid.items()):
+            if data[self.parent_field] not in existing:
+                self.error(index, {self.parent_field: [
+                    'Объект не найден.'
+                ]})
+                del valid[index]
+
+    def validate_batch(self, valid):
+        """Проверки, которым нужна вся пачка сразу."""
+
+    def build(self, data):
+        return self.model(**{
+            f'{self.parent_field}_id': data[self.parent_field],
+            **{key: value for key, value in data.items()
+               if key != self.parent_field},
+        })
+
+    def insert(self, objects):
+        self.model.objects.bulk_create(objects)
+
+    def after_insert(self, objects):
+        """Денормализованные данные пересчитываются раз на пачку."""
+
+    def log_inserted(self, objects):
+        # bulk_create не шлёт post_save: журнал изменений пишем сами.
+        log_changes(self.model, [obj.pk for obj in objects], Change.CREATE)
+
+    def run(self, items):
+        self.results = [None] * len(items)
+        valid = self.validate_items(items)
+        if valid:
+            self.resolve_parents(valid)
+        if valid:
+            self.validate_batch(valid)
+        objects = {index: self.build(data) for index, data in valid.items()}
+        if objects:
+            with transaction.atomic():
+                self.insert(list(objects.values()))
+                self.after_insert(list(objects.values()))
+                self.log_inserted(list(objects.values()))
+        for index, obj in objects.items():
+            self.results[index] = {
+                'status': status.HTTP_201_CREATED,
+                'data': self.serializer_class(obj).data,
+            }
+        return self.results
+
+
+class ReviewBatchCreate(BatchCreate):
+    model = Review
+    parent_model = Title
+    parent_field = 'title'
+    item_serializer_class = ReviewBatchItemSerializer
+    serializer_class = ReviewSerializer
+
+    def validate_batch(self, valid):
+        pairs = {
+            (data['author'].pk, data['title']) for data in valid.values()
+        }
+        existing = set(
+            Review.objects.filter(
+                author__in={author for author, _ in pairs},
+                title__in={title for _, title in pairs},
+            ).values_list('author_id', 'title_id')
+        )
+        for index, data in list(valid.items()):
+            pair = (data['author'].pk, data['title'])
+            if pair in existing:
+                self.error(index, {'non_field_errors': [
+                    'Отзыв на это произведение уже оставлен.'
+                ]})
+                del valid[index]
+            else:
+                existing.add(pair)
+
+    def insert(self, objects):
+        super().insert(objects)
+        if connection.features.can_return_ids_from_bulk_insert:
+            return
+        # Базы без RETURNING: id находим по уникальной паре автор/произведение.
+        rows = Review.objects.filter(
+            author__in={obj.author_id for obj in objects},
+            title__in={obj.title_id for obj in objects},
+        ).values_list('pk', 'author_id', 'title_id')
+        ids = {(author, title): pk for pk, author, title in rows}
+        for obj in objects:
+            obj.pk = ids[(obj.author_id, obj.title_id)]
+
+    def after_insert(self, objects):
+        record_review_events([
+            (obj.title_id, obj.score, obj.pub_date, 1) for obj in objects
+        ])
+        # bulk_create не шлёт сигналов, сбрасываем кэш сами.
+        bump_version_on_commit(Review)
+
+
+class CommentBatchCreate(BatchCreate):
+    model = Comment
+    parent_model = Review
+    parent_field = 'review'
+    item_serializer_class = CommentBatchItemSerializer
+    serializer_class = CommentSerializer
+
+    def insert(self, objects):
+        if connection.features.can_return_ids_from_bulk_insert:
+            super().insert(objects)
+            return
+        # У комментариев нет естественного ключа, чтобы найти их id
+        # после bulk_create, поэтому на таких базах вставляем по одному.
+        for obj in objects:
+            obj.save()
+
+    def after_insert(self, objects):
+        bump_version_on_commit(Comment)
+
+    def log_inserted(self, objects):
+        # Сохранённые по одному комментарии уже записаны сигналами.
+        if connection.features.can_return_ids_from_bulk_insert:
+            super().log_inserted(objects)
@@ -0,0 +1,330 @@
+"""Замер маршрутов API: латентность, пропускная способность, SQL-запросы.
+
+Маршруты гоняются последовательно через тестовый клиент Django
+в текущем процессе или по HTTP к запущенному серверу (например,
+локальному gunicorn), по HTTP — и из нескольких потоков сразу,
+чтобы сравнить синхронный и ASGI-режимы под нагрузкой. Результат —
+JSON, который можно сохранить как базовый и сравнивать с ним
+следующие прогоны.
+"""
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.db import connection
+from django.db.models import Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+from reviews.models import Categories, Comment, Genres, Review, Title, User
+
+from .cache import get_cache
+
+PERCENTILES = (50, 95, 99)
+BENCHMARK_USERS = {
+    'admin': ('benchmark_admin', User.ADMIN),
+    'user': ('benchmark_user', User.USER),
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    role: str = None
+    body: object = None
+
+    def request_body(self, iteration):
+        if callable(self.body):
+            return self.body(iteration)
+        return self.body
+
+
+def percentile(values, rank):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, -(-rank * len(ordered) // 100) - 1)
+    return ordered[index]
+
+
+def benchmark_user(role):
+    username, user_role = BENCHMARK_USERS[role]
+    user, _ = User.objects.get_or_create(
+        username=username,
+        defaults={'email': f'{username}@example.com', 'role': user_role},
+    )
+    return user
+
+
+def signup_prefix(run):
+    return f'bench{run}_'
+
+
+@contextmanager
+def benchmark_session(run):
+    """Служебные пользователи прогона и зарегистрированные им удаляются
+    в конце, даже если замер прервался; с ними — их отзывы и комментарии.
+    """
+    try:
+        yield
+    finally:
+        User.objects.filter(
+            Q(username__in=[name for name, _ in BENCHMARK_USERS.values()])
+            | Q(username__startswith=signup_prefix(run))
+        ).delete()
+
+
+def build_scenarios(writes=False, run=None):
+    """Сценарии для всех маршрутов api/urls.py на данных из базы."""
+    title = Title.objects.order_by('-reviews_count', 'id').first()
+    if title is None:
+        raise ValueError('В базе нет произведений, см. generate_data.')
+    comment = (
+        Comment.objects.filter(review__title=title)
+        .select_related('review').first()
+    )
+    review = (
+        comment.review if comment is not None
+        else title.reviews.order_by('-pub_date').first()
+    )
+    genre = Genres.objects.first()
+    category = Categories.objects.first()
+    user = benchmark_user('user')
+    search = urlencode({'search': title.name.split()[0]})
+
+    titles = '/api/v1/titles/'
+    scenarios = [
+        Scenario('titles-list', 'GET', titles),
+        Scenario('titles-list-sparse', 'GET',
+                 f'{titles}?fields=id,name,rating'),
+        Scenario('titles-list-cursor', 'GET', f'{titles}?pagination=cursor'),
+        Scenario('titles-search', 'GET', f'{titles}?{search}'),
+        Scenario('titles-detail', 'GET', f'{titles}{title.id}/'),
+        Scenario('titles-stats', 'GET', f'{titles}{title.id}/stats/'),
+        Scenario('titles-top', 'GET', f'{titles}top/'),
+        Scenario('titles-trending', 'GET', f'{titles}trending/'),
+        Scenario('reviews-list', 'GET', f'{titles}{title.id}/reviews/'),
+        Scenario('genres-list', 'GET', '/api/v1/genres/'),
+        Scenario('categories-list', 'GET', '/api/v1/categories/'),
+        Scenario('users-list', 'GET', '/api/v1/users/', role='admin'),
+        Scenario('users-detail', 'GET', f'/api/v1/users/{user.username}/',
+                 role='admin'),
+        Scenario('users-me', 'GET', '/api/v1/users/me/', role='user'),
+        Scenario('export', 'GET', '/api/v1/export/genre.csv', role='admin'),
+        Scenario('metrics', 'GET', '/api/v1/metrics/', role='admin'),
+    ]
+    if genre is not None and category is not None:
+        scenarios.append(Scenario(
+            'titles-list-filtered', 'GET',
+            f'{titles}?'
+            + urlencode({'genre': genre.slug, 'category': category.slug}),
+        ))
+    if review is not None:
+        reviews = f'{titles}{title.id}/reviews/{review.id}/'
+        scenarios += [
+            Scenario('reviews-detail', 'GET', reviews),
+            Scenario('comments-list', 'GET', f'{reviews}comments/'),
+        ]
+    if comment is not None:
+        scenarios.append(Scenario(
+            'comments-detail', 'GET',
+            f'{titles}{title.id}/reviews/{review.id}/comments/{comment.id}/',
+        ))
+    if writes:
+        scenarios += write_scenarios(
+            title, review, int(time.time()) if run is None else run
+        )
+    return scenarios
+
+
+def write_scenarios(title, review, run):
+    prefix = signup_prefix(run)
+    scenarios = [
+        Scenario(
+            'signup', 'POST', '/api/v1/auth/signup/',
+            body=lambda i: {'username': f'{prefix}{i}',
+                            'email': f'{prefix}{i}@example.com'},
+        ),
+        Scenario(
+            'obtain_token-invalid', 'POST', '/api/v1/auth/token/',
+            body={'username': BENCHMARK_USERS['user'][0],
+                  'confirmation_code': '0-0'},
+        ),
+    ]
+    if review is not None:
+        comments = (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        )
+        scenarios += [
+            Scenario('comments-create', 'POST', comments, role='user',
+                     body={'text': 'Нагрузочный комментарий'}),
+            Scenario(
+                'comments-batch', 'POST', '/api/v1/batch/comments/',
+                role='user',
+                body={'items': [
+                    {'review': review.id, 'text': 'Пакетный комментарий'}
+                ] * 10},
+            ),
+        ]
+    return scenarios
+
+
+def auth_header(role):
+    if role is None:
+        return None
+    token = RefreshToken.for_user(benchmark_user(role)).access_token
+    return f'Bearer {token}'
+
+
+class ClientRunner:
+    """Запросы через тестовый клиент Django с подсчётом SQL."""
+    counts_queries = True
+
+    def __init__(self, cold=False):
+        self.client = Client(HTTP_HOST='localhost')
+        self.cold = cold
+
+    def request(self, scenario, body, authorization):
+        headers = {}
+        if authorization:
+            headers['HTTP_AUTHORIZATION'] = authorization
+        if self.cold:
+            get_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.generic(
+                scenario.method, scenario.path,
+                data=json.dumps(body) if body is not None else '',
+                content_type='application/json', **headers,
+            )
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+        return response.status_code, len(context.captured_queries)
+
+
+class HttpRunner:
+    """Запросы по HTTP к уже запущенному серверу; SQL здесь не виден."""
+    counts_queries = False
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, scenario, body, authorization):
+        request = Request(
+            self.base_url + scenario.path, method=scenario.method,
+            data=json.dumps(body).encode() if body is not None else None,
+            headers={'Content-Type': 'application/json'},
+        )
+        if authorization:
+            request.add_header('Authorization', authorization)
+        try:
+            with urlopen(request) as response:
+                response.read()
+                return response.status, None
+        except HTTPError as error:
+            return error.code, None
+
+
+def timed_request(runner, scenario, body, authorization):
+    started = time.perf_counter()
+    status, query_count = runner.request(scenario, body, authorization)
+    return time.perf_counter() - started, status, query_count
+
+
+def measure(runner, scenario, iterations, warmup, concurrency=1):
+    authorization = auth_header(scenario.role)
+    counter = itertools.count()
+    for _ in range(warmup):
+        runner.request(
+            scenario, scenario.request_body(next(counter)), authorization
+        )
+    bodies = [
+        scenario.request_body(next(counter)) for _ in range(iterations)
+    ]
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            samples = list(pool.map(
+                lambda body: timed_request(
+                    runner, scenario, body, authorization),
+                bodies,
+            ))
+    else:
+        samples = [
+            timed_request(runner, scenario, body, authorization)
+            for body in bodies
+        ]
+    elapsed = time.perf_counter() - started
+    durations = [duration for duration, _, _ in samples]
+    queries = [query_count for _, _, query_count in samples]
+    result = {
+        f'p{rank}_ms': round(percentile(durations, rank) * 1000, 3)
+        for rank in PERCENTILES
+    }
+    result.update({
+        'mean_ms': round(sum(durations) / len(durations) * 1000, 3),
+        'throughput_rps': round(iterations / elapsed, 1),
+        'queries': (
+            round(sum(queries) / len(queries), 2)
+            if runner.counts_queries else None
+        ),
+        'statuses': sorted({status for _, status, _ in samples}),
+    })
+    return result
+
+
+def run_benchmark(runner, scenarios, iterations, warmup, concurrency=1):
+    return {
+        'meta': {
+            'runner': type(runner).__name__,
+            'iterations': iterations,
+            'warmup': warmup,
+            'concurrency': concurrency,
+            'sizes': {
+                model._meta.model_name: model.objects.count()
+                for model in (Title, Review, Comment, User)
+            },
+        },
+        'routes': {
+            scenario.name: measure(
+                runner, scenario, iterations, warmup, concurrency
+            )
+            for scenario in scenarios
+        },
+    }
+
+
+def compare(baseline, current, tolerance, min_delta_ms):
+    """Регрессии текущего прогона относительно базового.
+
+    Латентность считается регрессией, если выросла больше чем
+    на tolerance и на min_delta_ms; число SQL-запросов — при любом росте.
+    """
+    regressions = []
+    for name, result in current['routes'].items():
+        base = baseline['routes'].get(name)
+        if base is None:
+            continue
+        for metric in ('p95_ms', 'p99_ms'):
+            if (
+                result[metric] > base[metric] * (1 + tolerance)
+                and result[metric] - base[metric] > min_delta_ms
+            ):
+                regressions.append(
+                    f'{name}: {metric} {base[metric]} → {result[metric]}'
+                )
+        if (
+            result['queries'] is not None and base['queries'] is not None
+            and result['queries'] > base['queries']
+        ):
+            regressions.append(
+                f'{name}: queries {base["queries"]} → {result["queries"]}'
+            )
+    return regressions
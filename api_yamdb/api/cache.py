@@ -0,0 +1,151 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from api_yamdb.db.router import read_database
+
+VERSION_KEY = 'catalog:version:{}'
+STATS_KEY = 'catalog:stats:{}'
+RESPONSE_KEY = 'catalog:response:{}:{}:{}:{}'
+CHANGED_KEY = 'catalog:changed:{}'
+MODIFIED_KEY = 'catalog:modified:{}'
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def _initial_version():
+    # Стартуем со времени, чтобы после вытеснения счётчика из кэша
+    # не вернуться к версии, под которой уже лежат старые ответы.
+    return time.time_ns()
+
+
+def _increment(key, initial):
+    cache = get_cache()
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, initial, timeout=None)
+        return initial
+
+
+def bump_version(model):
+    """Сбрасывает закэшированные ответы, зависящие от модели."""
+    _increment(_version_key(model), _initial_version())
+    get_cache().set(
+        MODIFIED_KEY.format(model._meta.label_lower), time.time(),
+        timeout=None,
+    )
+    # Пока метка жива, реплики могут ещё не видеть изменения.
+    get_cache().set(
+        CHANGED_KEY.format(model._meta.label_lower), True,
+        settings.READ_YOUR_WRITES_SECONDS,
+    )
+
+
+def recently_changed(models):
+    return bool(get_cache().get_many([
+        CHANGED_KEY.format(model._meta.label_lower) for model in models
+    ]))
+
+
+def bump_version_on_commit(model):
+    transaction.on_commit(lambda: bump_version(model))
+
+
+def get_versions(models):
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = _initial_version()
+            cache.add(key, versions[key], timeout=None)
+    return [str(versions[key]) for key in keys]
+
+
+def last_modified(models):
+    """Время последнего сдвига версии любой из моделей.
+
+    Без отметки в кэше (вытеснена или кэш очищен) берём текущее время:
+    ответ будет считаться изменённым, но не устаревшим.
+    """
+    cache = get_cache()
+    keys = [MODIFIED_KEY.format(model._meta.label_lower) for model in models]
+    times = cache.get_many(keys)
+    for key in keys:
+        if key not in times:
+            times[key] = time.time()
+            cache.add(key, times[key], timeout=None)
+    return max(times.values(), default=None)
+
+
+def count(event):
+    _increment(STATS_KEY.format(event), 1)
+
+
+def cache_stats():
+    cache = get_cache()
+    events = ('hit', 'miss')
+    stats = cache.get_many([STATS_KEY.format(event) for event in events])
+    return {
+        event: stats.get(STATS_KEY.format(event), 0) for event in events
+    }
+
+
+def response_cache_key(request, basename, models, source):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    path = hashlib.md5(
+        f'{request.path}?{query}'.encode()
+    ).hexdigest()
+    return RESPONSE_KEY.format(
+        basename, source, ':'.join(get_versions(models)), path
+    )
+
+
+class CachedResponseMixin:
+    """Кэширует ответы list/retrieve до смены версии зависимых моделей."""
+    cache_dependencies = ()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        # Ответы с реплик кэшируются отдельно: пользователь, читающий
+        # свои записи с основной базы, не должен получить их из кэша.
+        replica = read_database() != DEFAULT_DB_ALIAS
+        key = response_cache_key(
+            request, self.basename, self.cache_dependencies,
+            'replica' if replica else 'primary',
+        )
+        data = cache.get(key)
+        if data is not None:
+            count('hit')
+            return Response(data, headers={'X-Cache': 'HIT'})
+        count('miss')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            timeout = settings.CATALOG_CACHE_TIMEOUT
+            if replica and recently_changed(self.cache_dependencies):
+                # Отстающая реплика могла отдать старые данные.
+                timeout = settings.READ_YOUR_WRITES_SECONDS
+            cache.set(key, response.data, timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
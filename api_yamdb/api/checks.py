@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# В этих бэкендах у каждого процесса свой кэш: то, что записал
+# в кэш один воркер, остальные не видят.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def check_replica_cache(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    if not settings.REPLICA_DATABASES or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        'Для чтения с реплик нужен общий для процессов кэш.',
+        hint=(
+            f'Сейчас: {backend}. Без общего кэша пользователь после записи '
+            'может попасть в другой процесс и прочитать с отстающей реплики. '
+            'Задайте CACHE_BACKEND, например Memcached.'
+        ),
+        id='api.E001',
+    )]
+
+
+@register()
+def check_write_behind_cache(app_configs, **kwargs):
+    backend = settings.CACHES[settings.CATALOG_CACHE_ALIAS]['BACKEND']
+    # В DummyCache ничего не кэшируется, устаревать нечему.
+    if (
+        not settings.RATING_WRITE_BEHIND
+        or backend != 'django.core.cache.backends.locmem.LocMemCache'
+    ):
+        return []
+    return [Error(
+        'Для RATING_WRITE_BEHIND нужен общий для процессов кэш.',
+        hint=(
+            f'Сейчас: {backend}. Оценки применяет отдельный процесс '
+            'score_flusher, и сброшенные им версии каталога не видны веб-'
+            'процессам: ответы о произведениях и их ETag отстают дольше '
+            'RATING_MAX_STALENESS. Задайте CACHE_BACKEND, например Memcached.'
+        ),
+        id='api.E002',
+    )]
@@ -0,0 +1,72 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+from .cache import get_versions, last_modified
+
+VALIDATED_STATUSES = (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED)
+
+
+def validity_window():
+    """Начало текущего окна длиной CATALOG_CACHE_TIMEOUT секунд."""
+    timeout = max(settings.CATALOG_CACHE_TIMEOUT, 1)
+    return int(time.time() // timeout * timeout)
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified по версиям моделей, без запросов к БД.
+
+    Версии из etag_dependencies сдвигает любая запись, в том числе
+    удаление (см. api.signals), поэтому ответ 304 отдаётся, пока
+    ни одна из моделей, чьи данные есть в ответе, не менялась.
+    Версии хранятся без срока, а запись мимо сигналов, не сдвинувшая
+    их, не должна давать 304 вечно: в валидаторы входит окно
+    CATALOG_CACHE_TIMEOUT, как и у кэша ответов.
+    """
+    etag_dependencies = ()
+
+    def get_validators(self, request):
+        window = validity_window()
+        source = ':'.join([
+            request.get_full_path(),
+            request.accepted_media_type or '',
+            str(window),
+            *get_versions(self.etag_dependencies),
+        ])
+        etag = quote_etag(hashlib.md5(source.encode()).hexdigest())
+        modified = last_modified(self.etag_dependencies)
+        if modified is None:
+            return etag, None
+        return etag, max(int(modified), window)
+
+    def check_not_modified(self):
+        """Проверки, которые нужны перед ответом 304."""
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=modified
+        )
+        if response is not None:
+            self.check_not_modified()
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in VALIDATED_STATUSES:
+            response['ETag'] = etag
+            if modified is not None:
+                response['Last-Modified'] = http_date(modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
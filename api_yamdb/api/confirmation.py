@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.utils.crypto import (constant_time_compare, get_random_string,
+                                 salted_hmac)
+from django.utils.http import base36_to_int, int_to_base36
+from reviews.models import User
+
+from api_yamdb.settings import CONFIRMATION_NONCE_LENGTH
+
+# Отсчёт времени в кодах, чтобы метка была короче.
+EPOCH = 978307200
+HASH_LENGTH = 20
+
+
+class ConfirmationCodeGenerator:
+    """Коды подтверждения без хранения в БД.
+
+    Код — метка времени и HMAC от id, почты и nonce пользователя.
+    Проверка не пишет в базу; nonce меняется только при выдаче токена,
+    поэтому код одноразовый.
+    """
+    key_salt = 'api.confirmation.ConfirmationCodeGenerator'
+
+    def _now(self):
+        return int(time.time()) - EPOCH
+
+    def _hash(self, user, timestamp):
+        value = f'{user.pk}{user.email}{user.confirmation_nonce}{timestamp}'
+        return salted_hmac(self.key_salt, value).hexdigest()[:HASH_LENGTH]
+
+    def make_code(self, user):
+        timestamp = self._now()
+        return f'{int_to_base36(timestamp)}-{self._hash(user, timestamp)}'
+
+    def check_code(self, user, code):
+        if not isinstance(code, str):
+            return False
+        try:
+            timestamp, code_hash = code.split('-')
+            timestamp = base36_to_int(timestamp)
+        except ValueError:
+            return False
+        if not constant_time_compare(self._hash(user, timestamp), code_hash):
+            return False
+        return (
+            0 <= self._now() - timestamp <= settings.CONFIRMATION_CODE_TIMEOUT
+        )
+
+    def redeem(self, user, code):
+        """Проверяет код и гасит его сменой nonce.
+
+        Условный UPDATE не даст обменять один код на токен дважды.
+        """
+        if not self.check_code(user, code):
+            return False
+        return User.objects.filter(
+            pk=user.pk,
+            confirmation_nonce=user.confirmation_nonce,
+        ).update(
+            confirmation_nonce=get_random_string(CONFIRMATION_NONCE_LENGTH),
+        ) == 1
+
+
+confirmation_codes = ConfirmationCodeGenerator()
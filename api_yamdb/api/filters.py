@@ -1,10 +1,26 @@
 from django_filters import rest_framework as django_filters
-from reviews.models import Title
+from rest_framework import filters
+from reviews.models import Categories, Genres, Title
+from reviews.search import get_search_backend
+
+from .snapshot import get_snapshot
+
+
+def catalog_filter(model, field_name):
+    """Слаг переводится в id по снимку каталога: фильтр без JOIN."""
+
+    def method(queryset, name, value):
+        pk = get_snapshot(model).pk_for(value)
+        if pk is None:
+            return queryset.none()
+        return queryset.filter(**{field_name: pk})
+
+    return django_filters.CharFilter(method=method)
 
 
 class GenreFilter(django_filters.FilterSet):
-    genre = django_filters.CharFilter(field_name='genre__slug')
-    category = django_filters.CharFilter(field_name='category__slug')
+    genre = catalog_filter(Genres, 'genretitle__genre')
+    category = catalog_filter(Categories, 'category')
     year = django_filters.NumberFilter(field_name='year')
     name = django_filters.CharFilter(field_name='name',
                                      lookup_expr='icontains')
@@ -12,3 +28,23 @@ class GenreFilter(django_filters.FilterSet):
     class Meta:
         model = Title
         fields = ('genre', 'category', 'year', 'name')
+
+
+class TitleSearchFilter(filters.SearchFilter):
+    """Полнотекстовый ?search= по названию и описанию с ранжированием.
+
+    Индекс в памяти отдаёт ранжированный список id: для списка он
+    остаётся в view.search_ranking, а страницы режет TitlesPagination.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        backend = get_search_backend()
+        if not backend.in_memory or view.action != 'list':
+            return backend.search(queryset, text)
+        view.search_ranking = backend.rank(text)
+        if not view.search_ranking:
+            return queryset.none()
+        return queryset
@@ -0,0 +1,116 @@
+import json
+import time
+
+from api.benchmark import (ClientRunner, HttpRunner, benchmark_session,
+                           build_scenarios, compare, run_benchmark)
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p95/p99, пропускную способность и число SQL-запросов '
+        'маршрутов API и сравнивает с базовым прогоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--base-url',
+            help='Адрес запущенного сервера, например http://127.0.0.1:8000. '
+                 'Без него запросы идут через тестовый клиент Django.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Параллельных запросов (только с --base-url).',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш ответов перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--writes', action='store_true',
+            help='Добавить пишущие маршруты (регистрация, комментарии).',
+        )
+        parser.add_argument(
+            '--route', action='append',
+            help='Замерить только указанные сценарии.',
+        )
+        parser.add_argument('--output', help='Куда сохранить результат.')
+        parser.add_argument(
+            '--allow-non-debug', action='store_true',
+            help='Разрешить прогон при DEBUG=False: он создаёт (и в конце '
+                 'удаляет) служебных пользователей, в том числе '
+                 'администратора.',
+        )
+        parser.add_argument(
+            '--baseline', help='Базовый результат для сравнения.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый относительный рост p95/p99.',
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=2.0,
+            help='Рост латентности меньше этого не считается регрессией.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['allow_non_debug']:
+            raise CommandError(
+                'DEBUG=False: похоже на рабочую базу. Прогон создаёт '
+                'служебных пользователей; запустите с --allow-non-debug.'
+            )
+        if options['concurrency'] > 1 and not options['base_url']:
+            raise CommandError('--concurrency работает только с --base-url.')
+        run = int(time.time())
+        with benchmark_session(run):
+            try:
+                scenarios = build_scenarios(
+                    writes=options['writes'], run=run
+                )
+            except ValueError as error:
+                raise CommandError(error)
+            if options['route']:
+                scenarios = [
+                    scenario for scenario in scenarios
+                    if scenario.name in options['route']
+                ]
+            if options['base_url']:
+                runner = HttpRunner(options['base_url'])
+            else:
+                runner = ClientRunner(cold=options['cold'])
+            result = run_benchmark(
+                runner, scenarios, options['iterations'], options['warmup'],
+                options['concurrency'],
+            )
+        self.report(result)
+        if options['output']:
+            with open(options['output'], 'w', encoding='UTF-8') as file:
+                json.dump(result, file, ensure_ascii=False, indent=2)
+        if options['baseline']:
+            with open(options['baseline'], encoding='UTF-8') as file:
+                baseline = json.load(file)
+            regressions = compare(
+                baseline, result, options['tolerance'],
+                options['min_delta_ms'],
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    def report(self, result):
+        self.stdout.write(
+            f'{"сценарий":<24}{"p50":>9}{"p95":>9}{"p99":>9}'
+            f'{"rps":>9}{"SQL":>7}  статусы'
+        )
+        for name, route in result['routes'].items():
+            queries = '-' if route['queries'] is None else route['queries']
+            self.stdout.write(
+                f'{name:<24}{route["p50_ms"]:>9}{route["p95_ms"]:>9}'
+                f'{route["p99_ms"]:>9}{route["throughput_rps"]:>9}'
+                f'{queries:>7}  {route["statuses"]}'
+            )
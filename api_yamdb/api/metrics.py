@@ -0,0 +1,295 @@
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from api_yamdb.db import health as db_health
+from api_yamdb.db.pool import process_pools
+
+from .cache import cache_stats
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNRESOLVED_ROUTE = 'unresolved'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def worker_label():
+    """Метка процесса: счётчики у каждого воркера свои.
+
+    Считается при выводе, а не при импорте: воркеры gunicorn
+    форкаются из мастера уже с загруженным модулем.
+    """
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class RouteStats:
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_seconds = 0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """Метрики запросов текущего процесса по (маршрут, метод, статус).
+
+    Каждый воркер отдаёт только свои счётчики с меткой worker;
+    суммировать по воркерам нужно в Prometheus (sum without(worker)).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = defaultdict(RouteStats)
+
+    def observe(self, route, method, status, duration, queries, db_seconds,
+                response_bytes):
+        with self.lock:
+            stats = self.routes[(route, method, status)]
+            stats.latency.observe(duration)
+            stats.queries.observe(queries)
+            stats.db_seconds += db_seconds
+            stats.response_bytes += response_bytes
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+    def render(self, extra_lines=()):
+        """Текстовый формат Prometheus (exposition format 0.0.4)."""
+        lines = []
+        with self.lock:
+            routes = sorted(self.routes.items())
+            self._render_histogram(
+                lines, routes, 'latency', 'yamdb_request_duration_seconds',
+                'Длительность обработки запроса.',
+            )
+            self._render_histogram(
+                lines, routes, 'queries', 'yamdb_request_db_queries',
+                'Число SQL-запросов на HTTP-запрос.',
+            )
+            self._render_counter(
+                lines, routes, 'db_seconds',
+                'yamdb_request_db_duration_seconds_total',
+                'Суммарное время SQL-запросов.',
+            )
+            self._render_counter(
+                lines, routes, 'response_bytes',
+                'yamdb_response_size_bytes_total',
+                'Суммарный размер тел ответов.',
+            )
+        lines.extend(extra_lines)
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _labels(key, **extra):
+        route, method, status = key
+        labels = {
+            'route': route, 'method': method, 'status': status,
+            'worker': worker_label(),
+        }
+        labels.update(extra)
+        return ','.join(
+            f'{name}="{value}"' for name, value in labels.items()
+        )
+
+    def _render_histogram(self, lines, routes, attribute, name, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for key, stats in routes:
+            histogram = getattr(stats, attribute)
+            for bound, total in histogram.cumulative():
+                labels = self._labels(key, le=bound)
+                lines.append(f'{name}_bucket{{{labels}}} {total}')
+            labels = self._labels(key)
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+    def _render_counter(self, lines, routes, attribute, name, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for key, stats in routes:
+            labels = self._labels(key)
+            lines.append(f'{name}{{{labels}}} {getattr(stats, attribute)}')
+
+
+registry = MetricsRegistry()
+
+
+def cache_metric_lines():
+    # Счётчики лежат в кэше каталога, общем для воркеров при общем
+    # CACHE_BACKEND, поэтому без метки worker.
+    name = 'yamdb_catalog_cache_requests_total'
+    lines = [
+        f'# HELP {name} Обращения к кэшу ответов каталога.',
+        f'# TYPE {name} counter',
+    ]
+    for result, total in cache_stats().items():
+        lines.append(f'{name}{{result="{result}"}} {total}')
+    return lines
+
+
+def metric_lines(name, help_text, values, kind='counter'):
+    """values: [(метки, значение)]; метка worker добавляется сама."""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    worker = ('worker', worker_label())
+    for labels, value in values:
+        rendered = ','.join(
+            f'{key}="{label}"' for key, label in (*labels, worker)
+        )
+        lines.append(f'{name}{{{rendered}}} {value}')
+    return lines
+
+
+def db_metric_lines():
+    lines = []
+    for event, help_text in (
+        ('connections', 'Установленные Django подключения к БД '
+                        '(с пулом — выдачи из пула).'),
+        ('health_check_failures', 'Постоянные подключения, не прошедшие '
+                                  'проверку перед запросом.'),
+    ):
+        lines += metric_lines(
+            f'yamdb_db_{event}_total', help_text,
+            [((('alias', alias),), total)
+             for (name, alias), total in sorted(db_health.stats.items())
+             if name == event],
+        )
+    pools = [(pool.alias, pool.metrics()) for pool in process_pools()]
+    if not pools:
+        return lines
+    lines += metric_lines(
+        'yamdb_db_pool_connections', 'Подключения в пуле по состоянию.',
+        [((('alias', alias), ('state', state)), metrics[state])
+         for alias, metrics in pools for state in ('idle', 'in_use')],
+        kind='gauge',
+    )
+    lines += metric_lines(
+        'yamdb_db_pool_size', 'Предельный размер пула.',
+        [((('alias', alias),), metrics['size']) for alias, metrics in pools],
+        kind='gauge',
+    )
+    for stat, help_text in (
+        ('opened', 'Открытые пулом подключения.'),
+        ('waits', 'Запросы, ждавшие свободного подключения.'),
+        ('wait_seconds', 'Суммарное ожидание свободного подключения, с.'),
+        ('timeouts', 'Запросы, не дождавшиеся подключения.'),
+        ('health_check_failures', 'Подключения из пула, не прошедшие '
+                                  'проверку.'),
+    ):
+        lines += metric_lines(
+            f'yamdb_db_pool_{stat}_total', help_text,
+            [((('alias', alias),), metrics[stat])
+             for alias, metrics in pools],
+        )
+    return lines
+
+
+def render_metrics():
+    return registry.render(cache_metric_lines() + db_metric_lines())
+
+
+class QueryRecorder:
+    """execute_wrapper, запоминающий SQL и время каждого запроса."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.monotonic() - started))
+
+    @property
+    def duration(self):
+        return sum(duration for _, duration in self.queries)
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED_ROUTE
+    return match.view_name
+
+
+def response_size(response):
+    if response.streaming:
+        return 0
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """Собирает латентность, число и время SQL-запросов и размер ответа.
+
+    Медленные запросы (дольше METRICS_SLOW_REQUEST_MS) пишутся в лог
+    вместе с их SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.monotonic()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(recorder)
+                )
+            response = self.get_response(request)
+        duration = time.monotonic() - started
+        route = route_name(request)
+        registry.observe(
+            route, request.method, response.status_code, duration,
+            len(recorder.queries), recorder.duration,
+            response_size(response),
+        )
+        if duration * 1000 >= settings.METRICS_SLOW_REQUEST_MS:
+            self.log_slow_request(request, route, duration, recorder)
+        return response
+
+    @staticmethod
+    def log_slow_request(request, route, duration, recorder):
+        statements = '\n'.join(
+            f'  {query_duration * 1000:.1f} ms: {sql}'
+            for sql, query_duration in recorder.queries
+        )
+        logger.warning(
+            'Медленный запрос %s %s (%s): %.0f ms, SQL: %d за %.0f ms\n%s',
+            request.method, request.get_full_path(), route, duration * 1000,
+            len(recorder.queries), recorder.duration * 1000, statements,
+        )
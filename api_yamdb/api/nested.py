@@ -0,0 +1,58 @@
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+
+class NestedParentMixin:
+    """Вложенный маршрут: родитель из URL проверяется без лишних запросов.
+
+    Выборка фильтруется по id родителя прямо из URL, поэтому для
+    объекта существование родителя проверяется тем же запросом.
+    Отдельный EXISTS нужен только пустому списку и ответу 304 на список,
+    а сам родитель грузится не больше одного раза за запрос и только
+    при создании.
+    """
+    parent_model = None
+    parent_field = None
+    # Поле модели родителя: именованный аргумент из URL.
+    parent_lookups = {}
+
+    def parent_filter(self):
+        return {
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookups.items()
+        }
+
+    def nested_filter(self):
+        return {
+            f'{self.parent_field}__{field}': value
+            for field, value in self.parent_filter().items()
+        }
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model.objects.only('pk'), **self.parent_filter()
+            )
+        return self._parent
+
+    def check_parent_exists(self):
+        if hasattr(self, '_parent'):
+            return
+        exists = self.parent_model.objects.filter(
+            **self.parent_filter()
+        ).exists()
+        if not exists:
+            raise Http404
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        # Пустая страница без родителя — 404, а не пустой список.
+        if not page:
+            self.check_parent_exists()
+        return page
+
+    def check_not_modified(self):
+        # Родитель мог быть удалён без отзывов или комментариев:
+        # их версия тогда не сдвинулась, а 304 отдавать нельзя.
+        if self.action == 'list':
+            self.check_parent_exists()
@@ -1,9 +1,133 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (CursorPagination, LimitOffsetPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from reviews.search import ranked_ids, ranked_page
 
 
-class TitlesPagination(PageNumberPagination):
+class CursorOnRequestPagination:
+    """Переключает на курсорную пагинацию по запросу клиента.
+
+    Курсор включается параметром ?pagination=cursor (или наличием
+    ?cursor=) и не считает COUNT(*) по всей выборке.
+    """
+    cursor_pagination_class = None
+    cursor_mode_param = 'pagination'
+    cursor_mode_value = 'cursor'
+
+    def use_cursor(self, request):
+        cursor_class = self.cursor_pagination_class
+        return (
+            cursor_class.cursor_query_param in request.query_params
+            or request.query_params.get(self.cursor_mode_param)
+            == self.cursor_mode_value
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlesCursorPagination(CursorPagination):
+    page_size = 20
+    ordering = ('name', 'id')
+
+    def get_ordering(self, request, queryset, view):
+        # Без ?ordering= OrderingFilter не даёт порядка — берём свой.
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return super().get_ordering(request, queryset, view)
+        return self.ordering
+
+
+class ReviewsCommentsCursorPagination(CursorPagination):
+    ordering = ('-pub_date', 'id')
+
+
+class TitlesPagination(CursorOnRequestPagination, PageNumberPagination):
     page_size = 20
+    cursor_pagination_class = TitlesCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ranking = getattr(view, 'search_ranking', None)
+        if not ranking:
+            return super().paginate_queryset(queryset, request, view)
+        # Результаты поиска по индексу в памяти: страницы по рангу
+        # режутся из списка id, курсор к ним не применяется.
+        self.cursor_paginator = None
+        ids = PageNumberPagination.paginate_queryset(
+            self, ranked_ids(queryset, ranking), request, view
+        )
+        return ranked_page(queryset, ids)
+
+
+class ReviewsCommentsPagination(CursorOnRequestPagination,
+                                LimitOffsetPagination):
+    cursor_pagination_class = ReviewsCommentsCursorPagination
 
 
 class GenresAndCategoriesPagination(PageNumberPagination):
     page_size = 20
+
+
+class LeaderboardPagination(PageNumberPagination):
+    """Страница рейтинга — диапазон мест, без COUNT(*) и OFFSET."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+        first = (self.page_number - 1) * page_size
+        # Лишнее место показывает, есть ли следующая страница.
+        rows = list(queryset.filter(
+            position__gt=first, position__lte=first + page_size + 1,
+        ))
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+        last = first + page_size
+        self.has_next = bool(rows) and rows[-1].position > last
+        return [row for row in rows if row.position <= last]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.page_query_param,
+            self.page_number + 1,
+        )
+
+    def get_previous_link(self):
+        if self.page_number == 1:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.page_query_param,
+            self.page_number - 1,
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
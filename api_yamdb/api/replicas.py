@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+from api_yamdb.db.router import read_from_primary, read_from_replica
+
+RECENT_WRITE_KEY = 'db:recent_write:{}'
+
+
+def remember_write(user):
+    if user.is_authenticated:
+        cache.set(
+            RECENT_WRITE_KEY.format(user.pk), True,
+            settings.READ_YOUR_WRITES_SECONDS,
+        )
+
+
+def wrote_recently(user):
+    return user.is_authenticated and cache.get(
+        RECENT_WRITE_KEY.format(user.pk), False
+    )
+
+
+class ReplicaReadsMixin:
+    """Безопасные запросы читают с реплик из REPLICA_DATABASES.
+
+    Аутентификация проходит по основной базе, на реплику поток
+    переключается после неё. Пользователь, который недавно что-то
+    записал, READ_YOUR_WRITES_SECONDS секунд читает с основной базы
+    и видит свои изменения несмотря на отставание реплик. Поток
+    возвращается на основную базу в конце dispatch, даже если вьюха
+    упала с исключением.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            read_from_primary()
+
+    def initial(self, request, *args, **kwargs):
+        read_from_primary()
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not wrote_recently(
+            request.user
+        ):
+            read_from_replica()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            remember_write(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,13 +1,18 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import DEFAULT_DB_ALIAS
 from rest_framework import serializers
-from rest_framework.relations import SlugRelatedField
+from rest_framework.relations import ManyRelatedField, SlugRelatedField
 from rest_framework.validators import UniqueTogetherValidator
-from reviews.models import Categories, Comment, Genres, Review, Title, User
+from reviews.models import (Categories, Comment, Genres, Review, Title,
+                            TitleRanking, TitleStats, User)
 from reviews.utils import validate_date_not_in_future, validate_username
 
-from api_yamdb.settings import (CONFIRMATION_CODE_LENGTH, EMAIL_MAX_LENGTH,
-                                USERNAME_MAX_LENGTH)
+from api_yamdb.settings import (BATCH_MAX_ITEMS, CHANGES_MAX_PAGE_SIZE,
+                                CHANGES_PAGE_SIZE, CONFIRMATION_CODE_LENGTH,
+                                EMAIL_MAX_LENGTH, USERNAME_MAX_LENGTH)
 
+from .snapshot import get_snapshot
+from .sparse import SparseFieldsSerializerMixin
 from .utils import CurrentTitleDefault
 
 
@@ -38,6 +43,39 @@ class SignUpSerializer(serializers.Serializer):
         required_fields = ('email', 'username',)
 
 
+class ReviewBatchItemSerializer(serializers.Serializer):
+    title = serializers.IntegerField(min_value=1)
+    text = serializers.CharField()
+    score = serializers.IntegerField(
+        validators=[
+            MaxValueValidator(10),
+            MinValueValidator(1),
+        ]
+    )
+
+
+class CommentBatchItemSerializer(serializers.Serializer):
+    review = serializers.IntegerField(min_value=1)
+    text = serializers.CharField()
+
+
+class BatchSerializer(serializers.Serializer):
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=BATCH_MAX_ITEMS,
+    )
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=CHANGES_MAX_PAGE_SIZE,
+        default=CHANGES_PAGE_SIZE,
+    )
+
+
 class UserSerializer(serializers.ModelSerializer):
     def validate_username(self, data):
         return validate_username(data)
@@ -64,13 +102,78 @@ class CategorySerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    category = CategorySerializer(required=False)
-    genre = GenreSerializer(
-        many=True,
-        required=False,
-    )
-    rating = serializers.IntegerField()
+class CatalogField(serializers.Field):
+    """Жанр или категория по снимку каталога, без запросов к их таблицам.
+
+    На входе слаг (при many — список слагов), на выходе слаг или,
+    с expand, {name, slug}. Из объекта читаются только id: при many —
+    из атрибута <source>_ids (см. Title.genre_ids).
+    """
+    default_error_messages = {
+        **SlugRelatedField.default_error_messages,
+        'not_a_list': ManyRelatedField.default_error_messages['not_a_list'],
+    }
+
+    def __init__(self, model, many=False, expand=False, **kwargs):
+        self.model = model
+        self.many = many
+        self.expand = expand
+        super().__init__(**kwargs)
+
+    def lookup(self, mapping, key):
+        snapshot = get_snapshot(self.model)
+        if not hasattr(self, 'maps'):
+            # Один снимок на весь вывод, а не сверка версии на каждый объект.
+            self.maps = snapshot.current()
+        value, self.maps = snapshot.lookup(self.maps, mapping, key)
+        return value
+
+    def get_attribute(self, instance):
+        if self.many:
+            return getattr(instance, f'{self.source}_ids')
+        return instance.serializable_value(self.source)
+
+    def represent(self, item):
+        if item is None:
+            # Удалён после загрузки произведения.
+            return None
+        name, slug = item
+        return {'name': name, 'slug': slug} if self.expand else slug
+
+    def to_representation(self, value):
+        if not self.many:
+            return self.represent(self.lookup('by_id', value))
+        items = filter(None, (self.lookup('by_id', pk) for pk in value))
+        return [self.represent(item) for item in sorted(items)]
+
+    def to_object(self, slug):
+        if isinstance(slug, bool) or not isinstance(slug, (str, int)):
+            self.fail('invalid')
+        pk = self.lookup('by_slug', str(slug))
+        if pk is None:
+            self.fail('does_not_exist', slug_name='slug', value=slug)
+        return self.model.from_db(
+            DEFAULT_DB_ALIAS, ('id', 'name', 'slug'),
+            (pk, *self.lookup('by_id', pk)),
+        )
+
+    def to_internal_value(self, data):
+        if not self.many:
+            return self.to_object(data)
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        return [self.to_object(slug) for slug in data]
+
+
+class TitleSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
+    compact_fields = {
+        'category': lambda: CatalogField(Categories, read_only=True),
+        'genre': lambda: CatalogField(Genres, many=True, read_only=True),
+    }
+    category = CatalogField(Categories, expand=True, read_only=True)
+    genre = CatalogField(Genres, many=True, expand=True, read_only=True)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -86,18 +189,59 @@ class TitleSerializer(serializers.ModelSerializer):
         read_only_fields = ('__all__',)
 
 
+class TitleRankingSerializer(serializers.ModelSerializer):
+    title = TitleSerializer(read_only=True)
+
+    class Meta:
+        model = TitleRanking
+        fields = ('position', 'score', 'title')
+
+
+def rounded(value):
+    return None if value is None else round(value, 2)
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Статистика считается из готовой строки TitleStats, без агрегатов."""
+    count = serializers.IntegerField(read_only=True)
+    mean = serializers.SerializerMethodField()
+    median = serializers.FloatField(read_only=True)
+    recent_mean = serializers.SerializerMethodField()
+    trend = serializers.SerializerMethodField()
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleStats
+        fields = (
+            'title',
+            'count',
+            'mean',
+            'median',
+            'recent_mean',
+            'trend',
+            'histogram',
+        )
+
+    def get_mean(self, stats):
+        return rounded(stats.mean)
+
+    def get_recent_mean(self, stats):
+        return rounded(stats.recent_mean)
+
+    def get_trend(self, stats):
+        if stats.recent_mean is None:
+            return None
+        return rounded(stats.recent_mean - stats.mean)
+
+    def get_histogram(self, stats):
+        return {
+            str(score): times for score, times in stats.histogram().items()
+        }
+
+
 class TitlePostSerializer(serializers.ModelSerializer):
-    category = SlugRelatedField(
-        slug_field='slug',
-        queryset=Categories.objects.all(),
-        required=False
-    )
-    genre = SlugRelatedField(
-        slug_field='slug',
-        queryset=Genres.objects.all(),
-        many=True,
-        required=False
-    )
+    category = CatalogField(Categories, required=False)
+    genre = CatalogField(Genres, many=True, required=False)
     year = serializers.IntegerField(
         validators=[validate_date_not_in_future]
     )
@@ -114,7 +258,8 @@ class TitlePostSerializer(serializers.ModelSerializer):
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         default=serializers.CurrentUserDefault(),
         queryset=User.objects.all(),
@@ -141,7 +286,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         ]
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         default=serializers.CurrentUserDefault(),
         queryset=User.objects.all(),
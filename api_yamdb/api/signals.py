@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.bulkload import rows_loaded
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title, User)
+from reviews.ratings import ratings_flushed
+
+from .authentication import principals
+from .cache import bump_version_on_commit
+
+CATALOG_MODELS = (Title, Genres, Categories, GenreTitle, Review)
+# Версия комментариев нужна только ETag, кэша ответов у них нет.
+VERSIONED_MODELS = CATALOG_MODELS + (Comment,)
+
+
+def bump_catalog_version(sender, **kwargs):
+    bump_version_on_commit(sender)
+
+
+def bump_title_genres_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version_on_commit(GenreTitle)
+
+
+def connect_catalog_signals():
+    for model in VERSIONED_MODELS:
+        post_save.connect(bump_catalog_version, sender=model)
+        post_delete.connect(bump_catalog_version, sender=model)
+        rows_loaded.connect(bump_catalog_version, sender=model)
+    m2m_changed.connect(
+        bump_title_genres_version, sender=Title.genre.through
+    )
+    ratings_flushed.connect(bump_catalog_version, sender=Title)
+
+
+def forget_principal(sender, instance, **kwargs):
+    # Второй сброс после коммита: параллельный запрос мог успеть
+    # закэшировать строку, которую эта транзакция ещё не зафиксировала.
+    principals.delete(instance.pk)
+    transaction.on_commit(lambda: principals.delete(instance.pk))
+
+
+def connect_principal_signals():
+    post_save.connect(forget_principal, sender=User)
+    post_delete.connect(forget_principal, sender=User)
@@ -0,0 +1,105 @@
+"""Снимок жанров и категорий в памяти процесса.
+
+Таблицы маленькие и почти не меняются, а нужны при каждом выводе
+и записи произведения. Снимок грузится один раз на процесс,
+а перед использованием сверяется с версией модели в кэше каталога
+(её сдвигает любая запись, см. api.signals) — одно чтение из кэша
+вместо запроса к БД. С кэшем в памяти процесса чужие записи не
+видны, поэтому снимок живёт не дольше CATALOG_CACHE_TIMEOUT.
+
+Промах по ключу перечитывает таблицу: объект мог появиться мимо
+API, не сдвинув версию. Чтобы поток несуществующих слагов не гонял
+полную перезагрузку под блокировкой, при той же версии снимок
+перечитывается на промахе не чаще раза в MISS_RELOAD_INTERVAL секунд.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .cache import get_versions
+
+CatalogMaps = namedtuple('CatalogMaps', 'by_id by_slug version loaded')
+
+MISS_RELOAD_INTERVAL = 1
+
+
+class CatalogSnapshot:
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.maps = None
+
+    def load(self, version):
+        # Снимок живёт долго: читаем с основной базы, а не с реплики.
+        rows = self.model.objects.using(DEFAULT_DB_ALIAS).values_list(
+            'pk', 'name', 'slug'
+        )
+        by_id = {pk: (name, slug) for pk, name, slug in rows}
+        self.maps = CatalogMaps(
+            by_id=by_id,
+            by_slug={slug: pk for pk, (_, slug) in by_id.items()},
+            version=version,
+            loaded=time.monotonic(),
+        )
+        return self.maps
+
+    def is_fresh(self, maps, version):
+        return (
+            maps is not None
+            and maps.version == version
+            and time.monotonic() - maps.loaded
+            < settings.CATALOG_CACHE_TIMEOUT
+        )
+
+    def current(self):
+        # Версию читаем до строк: запись после неё сдвинет версию снова.
+        version, = get_versions([self.model])
+        maps = self.maps
+        if self.is_fresh(maps, version):
+            return maps
+        with self.lock:
+            if self.is_fresh(self.maps, version):
+                return self.maps
+            return self.load(version)
+
+    def reload(self):
+        """Для промаха: объект мог появиться до сдвига версии.
+
+        Недавний снимок той же версии не перечитывается — промах
+        по нему считается отрицательным ответом.
+        """
+        version, = get_versions([self.model])
+        with self.lock:
+            maps = self.maps
+            if (
+                maps is not None
+                and maps.version == version
+                and time.monotonic() - maps.loaded < MISS_RELOAD_INTERVAL
+            ):
+                return maps
+            return self.load(version)
+
+    def lookup(self, maps, mapping, key):
+        """Значение из by_id или by_slug и снимок, в котором искали."""
+        if key not in getattr(maps, mapping):
+            maps = self.reload()
+        return getattr(maps, mapping).get(key), maps
+
+    def pk_for(self, slug):
+        pk, _ = self.lookup(self.current(), 'by_slug', slug)
+        return pk
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(model):
+    with _snapshots_lock:
+        if model not in _snapshots:
+            _snapshots[model] = CatalogSnapshot(model)
+        return _snapshots[model]
@@ -0,0 +1,88 @@
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+SPARSE_ACTIONS = ('list', 'retrieve')
+
+
+def split_param(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет в сериализаторе только поля из fields.
+
+    Связи из compact_fields, не перечисленные в expand, отдаются
+    в компактном виде (slug) вместо вложенного объекта.
+    """
+    compact_fields = {}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None:
+            return
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+        for name, make_field in self.compact_fields.items():
+            if name in self.fields and name not in expand:
+                self.fields[name] = make_field()
+
+
+class SparseFieldsMixin:
+    """?fields= и ?expand= для list и retrieve.
+
+    Без параметров ответ прежний. С ними сериализатор отдаёт только
+    запрошенные поля, а sparse_queryset() урезает SQL под них.
+    """
+
+    def get_sparse_fields(self):
+        """(поля, раскрываемые связи) или None, если параметров нет."""
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+        self._sparse_fields = None
+        params = self.request.query_params
+        if self.action not in SPARSE_ACTIONS or not (
+            FIELDS_PARAM in params or EXPAND_PARAM in params
+        ):
+            return None
+        serializer_class = self.get_serializer_class()
+        available = {
+            name for name, field in serializer_class().fields.items()
+            if not field.write_only
+        }
+        expand = split_param(params.get(EXPAND_PARAM, ''))
+        fields = (
+            split_param(params[FIELDS_PARAM]) if FIELDS_PARAM in params
+            else set(available)
+        ) | expand
+        errors = {}
+        if fields - available:
+            errors[FIELDS_PARAM] = [
+                f'Неизвестные поля: {", ".join(sorted(fields - available))}.'
+            ]
+        expandable = set(getattr(serializer_class, 'compact_fields', ()))
+        if expand - expandable:
+            errors[EXPAND_PARAM] = [
+                'Раскрыть можно только: '
+                f'{", ".join(sorted(expandable)) or "—"}.'
+            ]
+        if errors:
+            raise ValidationError(errors)
+        self._sparse_fields = (fields, expand)
+        return self._sparse_fields
+
+    def sparse_queryset(self, queryset, fields, expand):
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        sparse = self.get_sparse_fields()
+        if sparse is None:
+            return queryset
+        return self.sparse_queryset(queryset, *sparse)
+
+    def get_serializer(self, *args, **kwargs):
+        sparse = self.get_sparse_fields()
+        if sparse is not None:
+            kwargs['fields'], kwargs['expand'] = sparse
+        return super().get_serializer(*args, **kwargs)
@@ -2,7 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoriesViewSet, CommentViewSet, GenresViewSet,
-                    ReviewViewSet, TitlesViewSet, UserViewSet, signup, token)
+                    ReviewViewSet, TitlesViewSet, UserViewSet, changes,
+                    comments_batch, export, metrics, reviews_batch, signup,
+                    token)
 
 app_name = 'api'
 
@@ -25,5 +27,14 @@ router_v1.register(
 urlpatterns = [
     path('v1/auth/token/', token, name='obtain_token'),
     path('v1/auth/signup/', signup, name='signup'),
+    path(
+        'v1/export/<str:table>.<str:export_format>',
+        export,
+        name='export'
+    ),
+    path('v1/metrics/', metrics, name='metrics'),
+    path('v1/changes/', changes, name='changes'),
+    path('v1/batch/reviews/', reviews_batch, name='reviews-batch'),
+    path('v1/batch/comments/', comments_batch, name='comments-batch'),
     path('v1/', include(router_v1.urls)),
 ]
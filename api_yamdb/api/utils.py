@@ -1,6 +1,6 @@
-from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
 from reviews.models import Title
+from reviews.outbox import enqueue_mail
 
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
 
@@ -9,8 +9,11 @@ class CurrentTitleDefault:
     requires_context = True
 
     def __call__(self, serializer_field):
-        title_id = serializer_field.context['view'].kwargs.get('title_id')
-        return get_object_or_404(Title, id=title_id)
+        view = serializer_field.context['view']
+        if getattr(view, 'parent_model', None) is Title:
+            # Произведение уже загружено вьюхой для этого запроса.
+            return view.get_parent()
+        return get_object_or_404(Title, id=view.kwargs.get('title_id'))
 
 
 def send_verification_mail(email, confirmation_code):
@@ -18,4 +21,4 @@ def send_verification_mail(email, confirmation_code):
     message = f'Ваш код для подтверждения регистрации: {confirmation_code}'
     from_email = DEFAULT_FROM_EMAIL
     recipient_list = [email, ]
-    return send_mail(subject, message, from_email, recipient_list)
+    return enqueue_mail(subject, message, from_email, recipient_list)
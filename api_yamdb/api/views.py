@@ -1,29 +1,46 @@
+from django.conf import settings
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils.crypto import get_random_string
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Categories, Genres, Review, Title, User
+from reviews.changes import changes_since
+from reviews.export import CONTENT_TYPES, TABLES, iter_export
+from reviews.leaderboards import TOP, TRENDING, category_board, genre_board
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title, TitleRanking, TitleStats, User, genre_links)
+from reviews.ratings import flush_stale_score_deltas
 
-from api_yamdb.settings import CONFIRMATION_CODE_LENGTH
-
-from .filters import GenreFilter
-from .paginations import GenresAndCategoriesPagination, TitlesPagination
+from .batch import CommentBatchCreate, ReviewBatchCreate
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .confirmation import confirmation_codes
+from .filters import GenreFilter, TitleSearchFilter
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import render_metrics
+from .nested import NestedParentMixin
+from .paginations import (GenresAndCategoriesPagination, LeaderboardPagination,
+                          ReviewsCommentsPagination, TitlesPagination)
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsModerOrAdminOrReadOnly
-from .serializers import (CategorySerializer, CommentSerializer,
+from .replicas import ReplicaReadsMixin, remember_write
+from .serializers import (BatchSerializer, CategorySerializer,
+                          ChangesQuerySerializer, CommentSerializer,
                           GenreSerializer, ReviewSerializer, SignUpSerializer,
-                          TitlePostSerializer, TitleSerializer,
+                          TitlePostSerializer, TitleRankingSerializer,
+                          TitleSerializer, TitleStatsSerializer,
                           TokenSerializer, UserSerializer)
+from .snapshot import get_snapshot
+from .sparse import SparseFieldsMixin
 from .utils import send_verification_mail
 
 
-class OnlyNameSlugViewSet(mixins.ListModelMixin,
+class OnlyNameSlugViewSet(ReplicaReadsMixin, CachedResponseMixin,
+                          mixins.ListModelMixin,
                           mixins.CreateModelMixin,
                           mixins.DestroyModelMixin,
                           viewsets.GenericViewSet):
@@ -42,16 +59,12 @@ class OnlyNameSlugViewSet(mixins.ListModelMixin,
     permission_classes=(AllowAny,)
 )
 def signup(request):
-    confirmation_code = get_random_string(length=CONFIRMATION_CODE_LENGTH)
-    serializer = SignUpSerializer(
-        data=request.data,
-        context={'confirmation_code': confirmation_code},
-    )
+    serializer = SignUpSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     email = serializer.validated_data['email']
     username = serializer.validated_data['username']
     try:
-        username, created = User.objects.get_or_create(
+        user, created = User.objects.get_or_create(
             username=username,
             email=email
         )
@@ -61,8 +74,8 @@ def signup(request):
             status=status.HTTP_400_BAD_REQUEST)
     else:
         send_verification_mail(
-            email=username.email,
-            confirmation_code=confirmation_code,
+            email=user.email,
+            confirmation_code=confirmation_codes.make_code(user),
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -75,14 +88,10 @@ def signup(request):
 def token(request):
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    username = serializer.initial_data['username']
-    confirmation_code = serializer.initial_data['confirmation_code']
+    username = serializer.validated_data['username']
+    confirmation_code = serializer.validated_data['confirmation_code']
     user = get_object_or_404(User, username=username)
-    if user.confirmation_code != confirmation_code:
-        user.confirmation_code = get_random_string(
-            length=CONFIRMATION_CODE_LENGTH
-        )
-        user.save()
+    if not confirmation_codes.redeem(user, confirmation_code):
         return Response(
             {
                 'confirmation_code': 'Код подтверждения неверный',
@@ -99,6 +108,72 @@ def token(request):
     )
 
 
+@api_view(['GET'])
+@permission_classes((IsAuthenticated, IsAdmin))
+def export(request, table, export_format):
+    """Потоковая выгрузка таблицы в CSV или NDJSON."""
+    if table not in TABLES or export_format not in CONTENT_TYPES:
+        raise Http404
+    response = StreamingHttpResponse(
+        iter_export(table, export_format),
+        content_type=CONTENT_TYPES[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{table}.{export_format}"'
+    )
+    return response
+
+
+@api_view(['GET'])
+@permission_classes((IsAuthenticated, IsAdmin))
+def changes(request):
+    """Изменения после номера since для инкрементальной синхронизации."""
+    serializer = ChangesQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    since = serializer.validated_data['since']
+    results = changes_since(since, serializer.validated_data['limit'])
+    return Response({
+        'next': results[-1]['seq'] if results else since,
+        'results': results,
+    })
+
+
+@api_view(['GET'])
+@permission_classes((IsAuthenticated, IsAdmin))
+def metrics(request):
+    """Метрики запросов процесса в формате Prometheus."""
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+
+def batch_create(request, batch_class):
+    serializer = BatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        results = batch_class(request.user).run(
+            serializer.validated_data['items']
+        )
+    except IntegrityError:
+        return Response(
+            'Пачка конфликтует с параллельной записью, повторите запрос.',
+            status=status.HTTP_409_CONFLICT)
+    remember_write(request.user)
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes((IsAuthenticated,))
+def reviews_batch(request):
+    """Создаёт до BATCH_MAX_ITEMS отзывов к разным произведениям."""
+    return batch_create(request, ReviewBatchCreate)
+
+
+@api_view(['POST'])
+@permission_classes((IsAuthenticated,))
+def comments_batch(request):
+    """Создаёт до BATCH_MAX_ITEMS комментариев к разным отзывам."""
+    return batch_create(request, CommentBatchCreate)
+
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -119,7 +194,7 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def me(self, request):
-        user = get_object_or_404(User, username=request.user.username)
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             return Response(
                 UserSerializer(user).data,
@@ -136,61 +211,155 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score')).all()
+class TitlesViewSet(ReplicaReadsMixin, ConditionalGetMixin,
+                    CachedResponseMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
+    queryset = Title.objects.with_relations()
+    cache_dependencies = (Title, Genres, Categories, GenreTitle, Review)
+    etag_dependencies = cache_dependencies
     serializer_class = TitlePostSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = TitlesPagination
-    filter_backends = (filters.SearchFilter, DjangoFilterBackend,
+    filter_backends = (TitleSearchFilter, DjangoFilterBackend,
                        filters.OrderingFilter)
-    search_fields = ('name',)
+    search_fields = ('name', 'description')
     filterset_class = GenreFilter
+    lookup_value_regex = r'\d+'
     ordering_fields = ('name',)
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == 'GET' and settings.RATING_WRITE_BEHIND:
+            # До кэша и ETag: рейтинг не старше RATING_MAX_STALENESS.
+            flush_stale_score_deltas()
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleSerializer
         return TitlePostSerializer
 
+    def sparse_queryset(self, queryset, fields, expand):
+        # name нужен курсорной пагинации и сортировке по умолчанию.
+        columns = {'id', 'name'} | (
+            {'year', 'rating', 'description'} & fields
+        )
+        queryset = queryset.prefetch_related(None)
+        if 'category' in fields:
+            columns.add('category')
+        if 'genre' in fields:
+            queryset = queryset.prefetch_related(genre_links())
+        return queryset.only(*columns)
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        stats = TitleStats.objects.filter(title=pk).first()
+        if stats is None:
+            # Строки нет только у загруженных в обход сигналов произведений.
+            stats = TitleStats(title=get_object_or_404(Title, pk=pk))
+        return Response(TitleStatsSerializer(stats).data)
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        """Лучшие по рейтингу; ?category= или ?genre= сужают список."""
+        board = TOP
+        for param, model, board_for in (
+            ('category', Categories, category_board),
+            ('genre', Genres, genre_board),
+        ):
+            if param in request.query_params:
+                pk = get_snapshot(model).pk_for(request.query_params[param])
+                if pk is None:
+                    raise Http404
+                board = board_for(pk)
+                break
+        return self.leaderboard(board)
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """Больше всего отзывов за последние дни."""
+        return self.leaderboard(TRENDING)
+
+    def leaderboard(self, board):
+        rankings = (
+            TitleRanking.objects.filter(board=board)
+            .select_related('title')
+            .prefetch_related(genre_links('title__genretitle_set'))
+            .defer('title__search_vector')
+        )
+        paginator = LeaderboardPagination()
+        page = paginator.paginate_queryset(rankings, self.request, self)
+        return paginator.get_paginated_response(
+            TitleRankingSerializer(page, many=True).data
+        )
+
 
 class GenresViewSet(OnlyNameSlugViewSet):
     queryset = Genres.objects.all()
     serializer_class = GenreSerializer
+    cache_dependencies = (Genres,)
 
 
 class CategoriesViewSet(OnlyNameSlugViewSet):
     queryset = Categories.objects.all()
     serializer_class = CategorySerializer
+    cache_dependencies = (Categories,)
+
 
+def sparse_review_comment_queryset(queryset, fields):
+    # pub_date нужен пагинации, author — проверке прав на объект.
+    columns = {'id', 'pub_date', 'author'} | ({'text', 'score'} & fields)
+    if 'author' in fields:
+        return queryset.only(*columns, 'author__username')
+    return queryset.select_related(None).only(*columns)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(ReplicaReadsMixin, NestedParentMixin,
+                    ConditionalGetMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly,
         IsModerOrAdminOrReadOnly]
-
-    def title_object(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+    pagination_class = ReviewsCommentsPagination
+    parent_model = Title
+    parent_field = 'title'
+    etag_dependencies = (Review,)
+    parent_lookups = {'pk': 'title_id'}
 
     def get_queryset(self):
-        return self.title_object().reviews.all()
+        queryset = Review.objects.filter(**self.nested_filter())
+        if self.action in ('update', 'partial_update'):
+            # Проверке уникальности нужно произведение: берём тем же JOIN.
+            return queryset.select_related('author', 'title')
+        return queryset.select_related('author')
+
+    def sparse_queryset(self, queryset, fields, expand):
+        return sparse_review_comment_queryset(queryset, fields)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.title_object())
+        serializer.save(author=self.request.user, title=self.get_parent())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadsMixin, NestedParentMixin,
+                     ConditionalGetMixin, SparseFieldsMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly,
         IsModerOrAdminOrReadOnly]
-
-    def review_object(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'),
-                                 title=self.kwargs.get('title_id'))
+    pagination_class = ReviewsCommentsPagination
+    parent_model = Review
+    parent_field = 'review'
+    etag_dependencies = (Comment,)
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
 
     def get_queryset(self):
-        return self.review_object().comments.all()
+        return Comment.objects.filter(
+            **self.nested_filter()
+        ).select_related('author')
+
+    def sparse_queryset(self, queryset, fields, expand):
+        return sparse_review_comment_queryset(queryset, fields)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.review_object())
+        serializer.save(author=self.request.user, review=self.get_parent())
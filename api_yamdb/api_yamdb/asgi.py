@@ -3,14 +3,176 @@ ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+Django 2.2 не умеет ASGI сам, поэтому WSGI-приложение обёрнуто
+адаптером: тело запроса читается и ответ отдаётся в цикле событий,
+а Django работает в пуле из ASGI_THREADS потоков. У каждого потока
+своё подключение к БД, так что пул ограничивает и число подключений.
+Медленный клиент держит только сокет: поток освобождается, как только
+ответ готов. Запуск под uvicorn:
+
+    gunicorn api_yamdb.asgi:application -k uvicorn.workers.UvicornWorker
 """
 
+import asyncio
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 
-from django.core.asgi import get_asgi_application
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+# Потоковый ответ (выгрузка) ждёт медленного клиента, накопив столько частей.
+RESPONSE_QUEUE_SIZE = 8
+
+
+def build_environ(scope, body):
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': (scope.get('client') or ('',))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope['headers']:
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+class WSGIThreadPoolApplication:
+    """ASGI-приложение поверх WSGI с пулом потоков фиксированного размера."""
+
+    def __init__(self, wsgi_application, threads):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix='wsgi',
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f'Тип соединения не поддерживается: '
+                             f'{scope["type"]}')
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(RESPONSE_QUEUE_SIZE)
+
+        def emit(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        worker = loop.run_in_executor(
+            self.executor, self.run_wsgi, build_environ(scope, body), emit,
+        )
+        try:
+            await self.send_response(queue, send)
+        finally:
+            await self.drain(queue, worker)
+
+    async def read_body(self, receive):
+        """Тело запроса целиком или None, если клиент ушёл."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    def run_wsgi(self, environ, emit):
+        """Выполняется в потоке пула: Django и чтение ответа целиком."""
+        try:
+            started = {}
+
+            def start_response(status, headers, exc_info=None):
+                started['status'] = int(status.split(' ', 1)[0])
+                started['headers'] = headers
+
+            body = self.wsgi_application(environ, start_response)
+            try:
+                emit(('start', started['status'], started['headers']))
+                for chunk in body:
+                    if chunk:
+                        emit(('body', chunk))
+            finally:
+                # close() шлёт request_finished: Django закрывает подключение.
+                if hasattr(body, 'close'):
+                    body.close()
+        except Exception as error:
+            emit(('error', error))
+            return
+        emit(('end',))
+
+    async def send_response(self, queue, send):
+        item = await queue.get()
+        if item[0] == 'error':
+            raise item[1]
+        _, status, headers = item
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ],
+        })
+        while True:
+            item = await queue.get()
+            if item[0] == 'error':
+                raise item[1]
+            if item[0] == 'end':
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            await send({
+                'type': 'http.response.body',
+                'body': item[1],
+                'more_body': True,
+            })
+
+    async def drain(self, queue, worker):
+        """Разбирает очередь, пока поток не закончит, чтобы он не завис."""
+        while not worker.done():
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait(
+                {getter, worker}, return_when=asyncio.FIRST_COMPLETED,
+            )
+            getter.cancel()
+        await worker
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+application = WSGIThreadPoolApplication(
+    get_wsgi_application(), settings.ASGI_THREADS,
+)
@@ -0,0 +1,46 @@
+"""Проверка постоянных подключений перед запросом и их счётчики.
+
+С CONN_MAX_AGE подключение живёт между запросами и может умереть
+вместе с перезапуском БД или по таймауту на её стороне. Перед
+запросом подключение, которое не проверялось дольше
+HEALTH_CHECK_INTERVAL секунд, пингуется и при ошибке закрывается —
+запрос откроет новое вместо того, чтобы упасть.
+"""
+import time
+from collections import Counter
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+stats = Counter()
+
+
+def count_new_connection(sender, connection, **kwargs):
+    # С пулом сюда попадает и выдача подключения из пула.
+    stats[('connections', connection.alias)] += 1
+    connection.health_checked_at = time.monotonic()
+
+
+def check_connections(**kwargs):
+    now = time.monotonic()
+    for connection in connections.all():
+        interval = connection.settings_dict.get('HEALTH_CHECK_INTERVAL')
+        if (
+            interval is None
+            or connection.connection is None
+            or connection.in_atomic_block
+            or now - getattr(connection, 'health_checked_at', now) < interval
+        ):
+            continue
+        connection.health_checked_at = now
+        if not connection.is_usable():
+            stats[('health_check_failures', connection.alias)] += 1
+            connection.close()
+
+
+def connect_health_checks():
+    connection_created.connect(
+        count_new_connection, dispatch_uid='db_count_new_connection')
+    request_started.connect(
+        check_connections, dispatch_uid='db_check_connections')
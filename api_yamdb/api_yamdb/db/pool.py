@@ -0,0 +1,177 @@
+"""Пул подключений к БД в процессе для потоковых воркеров.
+
+Django держит по подключению на поток и закрывает его в конце
+запроса (или по истечении CONN_MAX_AGE). Бэкенды из api_yamdb.db
+вместо закрытия возвращают подключение в общий пул процесса,
+а следующий запрос любого потока берёт его оттуда без установки
+нового соединения. Размер пула ограничивает число подключений
+процесса; если свободных нет, запрос ждёт не дольше POOL_TIMEOUT.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+DEFAULT_POOL_TIMEOUT = 10
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+
+    def __init__(self, alias, size, timeout, health_check_interval=None):
+        self.alias = alias
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.idle = deque()
+        self.opened = 0
+        self.condition = threading.Condition()
+        self.stats = {
+            'opened': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+        }
+
+    def reserve(self):
+        """(подключение, момент возврата) или None — можно открыть новое.
+
+        Если пул исчерпан, ждёт освобождения подключения.
+        """
+        waited_since = None
+        with self.condition:
+            try:
+                while True:
+                    if self.idle:
+                        return self.idle.pop()
+                    if self.opened < self.size:
+                        self.opened += 1
+                        return None
+                    now = time.monotonic()
+                    if waited_since is None:
+                        waited_since = now
+                        self.stats['waits'] += 1
+                    remaining = self.timeout - (now - waited_since)
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'Нет свободных подключений к БД «{self.alias}» '
+                            f'за {self.timeout} с (пул на {self.size}).'
+                        )
+                    self.condition.wait(remaining)
+            finally:
+                if waited_since is not None:
+                    self.stats['wait_seconds'] += (
+                        time.monotonic() - waited_since
+                    )
+
+    def acquire(self, connect, is_usable):
+        while True:
+            reserved = self.reserve()
+            if reserved is None:
+                try:
+                    raw = connect()
+                except Exception:
+                    self.forget()
+                    raise
+                self.stats['opened'] += 1
+                return raw
+            raw, returned_at = reserved
+            interval = self.health_check_interval
+            if (
+                interval is None
+                or time.monotonic() - returned_at < interval
+                or is_usable(raw)
+            ):
+                return raw
+            self.stats['health_check_failures'] += 1
+            self.discard(raw)
+
+    def release(self, raw):
+        with self.condition:
+            self.idle.append((raw, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        self.forget()
+
+    def forget(self):
+        with self.condition:
+            self.opened -= 1
+            self.condition.notify()
+
+    def metrics(self):
+        with self.condition:
+            idle = len(self.idle)
+            return {
+                'size': self.size,
+                'idle': idle,
+                'in_use': self.opened - idle,
+                **self.stats,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    # После fork у дочернего процесса свой пул: сокеты родителя не делим.
+    key = (os.getpid(), alias)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                alias,
+                settings_dict['POOL_SIZE'],
+                settings_dict.get('POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT),
+                settings_dict.get('HEALTH_CHECK_INTERVAL'),
+            )
+        return _pools[key]
+
+
+def process_pools():
+    pid = os.getpid()
+    return [pool for (owner, _), pool in _pools.items() if owner == pid]
+
+
+class PooledDatabaseWrapperMixin:
+    """Берёт подключения из пула процесса и возвращает их туда."""
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        return self.pool.acquire(
+            lambda: connect(conn_params), self.raw_connection_is_usable,
+        )
+
+    def raw_connection_is_usable(self, raw):
+        current, self.connection = self.connection, raw
+        try:
+            return self.is_usable()
+        finally:
+            self.connection = current
+
+    def _close(self):
+        if self.connection is None:
+            return
+        raw = self.connection
+        try:
+            # Незавершённая транзакция не должна достаться другому запросу.
+            raw.rollback()
+        except Exception:
+            self.pool.discard(raw)
+            return
+        self.pool.release(raw)
@@ -0,0 +1,43 @@
+"""Чтение с реплик в пределах запроса.
+
+Вьюха переключает поток на реплику (read_from_replica) для
+безопасного запроса и возвращает на основную базу по его окончании.
+Запись и чтение внутри транзакции всегда идут в основную базу:
+реплика может отставать и не принимает записей.
+"""
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = threading.local()
+
+
+def read_from_replica():
+    replicas = settings.REPLICA_DATABASES
+    _state.alias = random.choice(replicas) if replicas else None
+
+
+def read_from_primary():
+    _state.alias = None
+
+
+def read_database():
+    alias = getattr(_state, 'alias', None)
+    if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_database()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, объекты с них связываются свободно.
+        return True
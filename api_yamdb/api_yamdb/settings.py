@@ -35,11 +35,12 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'django_filters',
-    'reviews',
-    'api',
+    'reviews.apps.ReviewsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,18 +70,111 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
+# Потоков Django (и подключений к БД) на процесс в режиме ASGI.
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', default=8))
+
+# DB_POOL_SIZE > 0 — пул подключений в процессе (см. api_yamdb/db/pool.py).
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', default=0))
+POOLED_DB_ENGINES = {
+    'django.db.backends.postgresql': 'api_yamdb.db.postgresql',
+    'django.db.backends.sqlite3': 'api_yamdb.db.sqlite3',
+}
+DB_ENGINE = os.getenv('DB_ENGINE', default='django.db.backends.postgresql')
 
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv('DB_ENGINE', default='django.db.backends.postgresql'),
+        'ENGINE': (
+            POOLED_DB_ENGINES.get(DB_ENGINE, DB_ENGINE) if DB_POOL_SIZE
+            else DB_ENGINE
+        ),
         'NAME': os.getenv('DB_NAME', default='postgres'),
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='my_key_for_test'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # С пулом подключение возвращается в пул в конце запроса,
+        # без пула — живёт в потоке CONN_MAX_AGE секунд.
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else int(
+            os.getenv('DB_CONN_MAX_AGE', default=60)
+        ),
+        'HEALTH_CHECK_INTERVAL': int(
+            os.getenv('DB_HEALTH_CHECK_INTERVAL', default=30)
+        ),
+        'POOL_SIZE': DB_POOL_SIZE,
+        'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=10)),
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2 — по базе на хост
+# с остальными параметрами основной (см. api_yamdb/db/router.py).
+REPLICA_DATABASES = []
+for number, host in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')), 1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ['api_yamdb.db.router.ReplicaRouter']
+# Сколько секунд после своей записи пользователь читает с основной базы.
+READ_YOUR_WRITES_SECONDS = float(
+    os.getenv('READ_YOUR_WRITES_SECONDS', default=5)
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', default=300))
+
+METRICS_SLOW_REQUEST_MS = int(
+    os.getenv('METRICS_SLOW_REQUEST_MS', default=500)
+)
+
+# Период, за который вес отзыва в «свежем» среднем падает вдвое.
+TITLE_STATS_HALF_LIFE_DAYS = float(
+    os.getenv('TITLE_STATS_HALF_LIFE_DAYS', default=30)
+)
+
+# Отложенный пересчёт рейтинга (команда flush_score_deltas): отзывы
+# копят дельты, воркер применяет их пачками. Рейтинг в ответах
+# отстаёт не больше чем на RATING_MAX_STALENESS секунд.
+RATING_WRITE_BEHIND = os.getenv('RATING_WRITE_BEHIND', default='') == 'True'
+RATING_FLUSH_INTERVAL = float(os.getenv('RATING_FLUSH_INTERVAL', default=2))
+RATING_FLUSH_BATCH_SIZE = int(
+    os.getenv('RATING_FLUSH_BATCH_SIZE', default=500)
+)
+RATING_MAX_STALENESS = float(os.getenv('RATING_MAX_STALENESS', default=30))
+
+# Материализованные рейтинги (команда refresh_leaderboards).
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', default=100))
+LEADERBOARD_MIN_REVIEWS = int(
+    os.getenv('LEADERBOARD_MIN_REVIEWS', default=3)
+)
+LEADERBOARD_TRENDING_DAYS = int(
+    os.getenv('LEADERBOARD_TRENDING_DAYS', default=7)
+)
+LEADERBOARD_REFRESH_INTERVAL = int(
+    os.getenv('LEADERBOARD_REFRESH_INTERVAL', default=300)
+)
+
+# Журнал изменений /api/v1/changes/, см. reviews.changes.
+CHANGES_PAGE_SIZE = int(os.getenv('CHANGES_PAGE_SIZE', default=500))
+CHANGES_MAX_PAGE_SIZE = int(os.getenv('CHANGES_MAX_PAGE_SIZE', default=5000))
+
+# Пусто — PostgreSQL-поиск на PostgreSQL, иначе обратный индекс в памяти.
+TITLE_SEARCH_BACKEND = os.getenv('TITLE_SEARCH_BACKEND', default='')
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -117,24 +211,48 @@ AUTH_USER_MODEL = 'reviews.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
 }
 
+# Кэш пользователей для аутентификации, см. api.authentication.
+PRINCIPAL_CACHE_SIZE = int(os.getenv('PRINCIPAL_CACHE_SIZE', default=10000))
+PRINCIPAL_CACHE_TTL = int(os.getenv('PRINCIPAL_CACHE_TTL', default=60))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND',
+    default='django.core.mail.backends.filebased.EmailBackend',
+)
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_HOST = os.getenv('EMAIL_HOST', default='localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', default=25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', default='') == 'True'
 DEFAULT_FROM_EMAIL = 'yamdb@example.com'
+
+# Очередь писем, её разбирает manage.py run_mail_worker.
+MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', default=100))
+MAIL_POLL_INTERVAL = float(os.getenv('MAIL_POLL_INTERVAL', default=2))
+MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', default=5))
+MAIL_RETRY_DELAY = int(os.getenv('MAIL_RETRY_DELAY', default=30))
+MAIL_RETRY_MAX_DELAY = int(os.getenv('MAIL_RETRY_MAX_DELAY', default=3600))
 USERNAME_MAX_LENGTH = 150
 EMAIL_MAX_LENGTH = 255
-CONFIRMATION_CODE_LENGTH = 10
+BATCH_MAX_ITEMS = 100
+CONFIRMATION_CODE_LENGTH = 32
+CONFIRMATION_NONCE_LENGTH = 12
+CONFIRMATION_CODE_TIMEOUT = int(
+    os.getenv('CONFIRMATION_CODE_TIMEOUT', default=24 * 60 * 60)
+)
 ALLOWED_SYMBOLS = r'^[a-zA-Z0-9@.+-_]*$'
 ROLE_MAX_LENGTH = 9
 FIRST_NAME_MAX_LENGTH = 150
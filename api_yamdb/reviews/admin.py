@@ -1,7 +1,7 @@
 from django.contrib import admin
 
-from .models import (Categories, Comment, Genres, GenreTitle, Review, Title,
-                     User)
+from .models import (Categories, Change, Comment, Genres, GenreTitle,
+                     OutgoingMail, Review, Title, User)
 
 
 @admin.register(User)
@@ -11,7 +11,6 @@ class UserAdmin(admin.ModelAdmin):
         'role',
         'bio',
         'email',
-        'confirmation_code',
     )
     empty_value_display = '-пусто-'
 
@@ -40,8 +39,11 @@ class TitleAdmin(admin.ModelAdmin):
         'name',
         'year',
         'category',
+        'rating',
         'description',
     )
+    list_select_related = ('category',)
+    readonly_fields = ('rating', 'reviews_count', 'score_sum')
     empty_value_display = '-пусто-'
 
 
@@ -51,6 +53,7 @@ class GenreTitleAdmin(admin.ModelAdmin):
         'title',
         'genre',
     )
+    list_select_related = ('title', 'genre')
     empty_value_display = '-пусто-'
 
 
@@ -63,6 +66,7 @@ class ReviewAdmin(admin.ModelAdmin):
         'score',
         'pub_date',
     )
+    list_select_related = ('author', 'title')
     empty_value_display = '-пусто-'
 
 
@@ -74,4 +78,33 @@ class CommentAdmin(admin.ModelAdmin):
         'text',
         'pub_date',
     )
+    list_select_related = ('author', 'review')
     empty_value_display = '-пусто-'
+
+
+@admin.register(OutgoingMail)
+class OutgoingMailAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject',
+        'to',
+        'status',
+        'attempts',
+        'next_attempt',
+        'sent',
+    )
+    list_filter = ('status',)
+    search_fields = ('to',)
+    empty_value_display = '-пусто-'
+
+
+@admin.register(Change)
+class ChangeAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'seq',
+        'table',
+        'object_id',
+        'action',
+        'created',
+    )
+    list_filter = ('table', 'action')
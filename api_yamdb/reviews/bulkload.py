@@ -0,0 +1,87 @@
+import csv
+import io
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connection
+from django.dispatch import Signal
+
+# Строки модели вставлены в обход сигналов: сбросить кэши (api.signals).
+rows_loaded = Signal()
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class TableWriter:
+    """Вставляет строки пачками в обход save() и сигналов моделей.
+
+    bulk_create не подходит: он вызывает pre_save полей и затирает
+    pub_date из файла текущим временем (auto_now_add).
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = model._meta.concrete_fields
+        self.columns = ', '.join(
+            connection.ops.quote_name(field.column) for field in self.fields
+        )
+        self.table = connection.ops.quote_name(model._meta.db_table)
+
+    def prepare(self, values):
+        obj = self.model(**values)
+        return [
+            field.get_db_prep_save(getattr(obj, field.attname), connection)
+            for field in self.fields
+        ]
+
+    def write(self, cursor, chunk):
+        rows = [self.prepare(values) for values in chunk]
+        placeholders = ', '.join(['%s'] * len(self.fields))
+        cursor.executemany(
+            f'INSERT INTO {self.table} ({self.columns}) '
+            f'VALUES ({placeholders})',
+            rows,
+        )
+
+
+class CopyTableWriter(TableWriter):
+    """Загрузка через COPY ... FROM STDIN на PostgreSQL."""
+
+    def write(self, cursor, chunk):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for values in chunk:
+            writer.writerow(
+                '' if value is None else value
+                for value in self.prepare(values)
+            )
+        buffer.seek(0)
+        not_null = ', '.join(
+            connection.ops.quote_name(field.column)
+            for field in self.fields if not field.null
+        )
+        cursor.copy_expert(
+            f'COPY {self.table} ({self.columns}) FROM STDIN '
+            f'WITH (FORMAT csv, FORCE_NOT_NULL ({not_null}))',
+            buffer,
+        )
+
+
+def get_writer_class():
+    if connection.vendor == 'postgresql':
+        return CopyTableWriter
+    return TableWriter
+
+
+def reset_sequences(models):
+    """Сдвигает последовательности id после вставки с явными id."""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
@@ -0,0 +1,115 @@
+"""Журнал изменений для инкрементальной синхронизации.
+
+Сигналы моделей пишут в Change номер, таблицу, id объекта и действие
+в той же транзакции, что и само изменение. Данные объекта не
+копируются: changes_since подставляет текущее состояние строки
+в колонках выгрузки (reviews.export.TABLES), так что полная
+выгрузка и журнал с её момента дают одну и ту же картину.
+
+id раздаётся при вставке, а виден после коммита: долгая транзакция
+закоммитила бы id меньше уже отданных, и потребитель его пропустил бы.
+Поэтому потребителю отдаётся seq, который sequence_changes выдаёт
+только закоммиченным записям. Нумерация идёт под своей блокировкой
+и коммитится до чтения, так что новые seq всегда больше отданных.
+"""
+from django.db import connection, transaction
+from django.db.models import F, Max, Min
+
+from .export import TABLES, to_text
+from .models import Change
+
+# Ключ pg_advisory_xact_lock: нумерации не идут параллельно.
+SEQUENCE_LOCK_ID = 0x6368616e6765
+
+TABLE_NAMES = {model: table for table, (model, _) in TABLES.items()}
+
+
+def is_tracked(model, update_fields=None):
+    """Попадает ли сохранение в журнал: меняются ли колонки выгрузки."""
+    if model not in TABLE_NAMES:
+        return False
+    if update_fields is None:
+        return True
+    _, columns = TABLES[TABLE_NAMES[model]]
+    exported = {field for _, field in columns}
+    return any(
+        model._meta.get_field(name).attname in exported
+        for name in update_fields
+    )
+
+
+def log_changes(model, ids, action):
+    Change.objects.bulk_create([
+        Change(table=TABLE_NAMES[model], object_id=pk, action=action)
+        for pk in ids
+    ])
+
+
+def log_change(model, pk, action):
+    Change.objects.create(
+        table=TABLE_NAMES[model], object_id=pk, action=action,
+    )
+
+
+def current_rows(changes):
+    """Текущие строки объектов из журнала: запрос на таблицу."""
+    ids = {}
+    for change in changes:
+        if change.action != Change.DELETE:
+            ids.setdefault(change.table, set()).add(change.object_id)
+    rows = {}
+    for table, pks in ids.items():
+        model, columns = TABLES[table]
+        names = [name for name, _ in columns]
+        queryset = model.objects.filter(pk__in=pks).values_list(
+            *(field for _, field in columns)
+        )
+        for row in queryset:
+            rows[table, row[0]] = dict(zip(names, map(to_text, row)))
+    return rows
+
+
+def sequence_changes():
+    """Выдаёт seq закоммиченным записям без него, возвращает их число.
+
+    Записи ещё открытых транзакций не видны и получат seq позже,
+    больше выданных сейчас. Записи с id меньше первой найденной,
+    закоммиченные во время нумерации, ждут следующего вызова.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(%s)', [SEQUENCE_LOCK_ID]
+                )
+        pending = Change.objects.filter(seq__isnull=True)
+        first = pending.aggregate(first=Min('id'))['first']
+        if first is None:
+            return 0
+        last = Change.objects.aggregate(last=Max('seq'))['last'] or 0
+        return pending.filter(id__gte=first).update(
+            seq=F('id') - first + last + 1
+        )
+
+
+def changes_since(since, limit):
+    """Не больше limit записей с seq больше since, по порядку.
+
+    У создания и изменения data — строка объекта сейчас или None,
+    если его уже удалили: тогда дальше в журнале есть удаление.
+    """
+    sequence_changes()
+    changes = list(
+        Change.objects.filter(seq__gt=since).order_by('seq')[:limit]
+    )
+    rows = current_rows(changes)
+    return [
+        {
+            'seq': change.seq,
+            'table': change.table,
+            'id': change.object_id,
+            'action': change.action,
+            'data': rows.get((change.table, change.object_id)),
+        }
+        for change in changes
+    ]
@@ -0,0 +1,16 @@
+import math
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def check_title_stats_half_life(app_configs, **kwargs):
+    half_life = settings.TITLE_STATS_HALF_LIFE_DAYS
+    if isinstance(half_life, (int, float)) and 0 < half_life < math.inf:
+        return []
+    return [Error(
+        'TITLE_STATS_HALF_LIFE_DAYS должен быть положительным числом.',
+        hint=f'Сейчас: {half_life!r}.',
+        id='reviews.E001',
+    )]
@@ -0,0 +1,100 @@
+import csv
+import json
+
+from .models import (Categories, Comment, Genres, GenreTitle, Review, Title,
+                     User)
+
+DEFAULT_CHUNK_SIZE = 2000
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# Колонки совпадают с файлами static/data/*.csv, чтобы выгрузка
+# загружалась обратно командой importcsv.
+TABLES = {
+    'users': (User, (
+        ('id', 'id'),
+        ('username', 'username'),
+        ('email', 'email'),
+        ('role', 'role'),
+        ('bio', 'bio'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    )),
+    'category': (Categories, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'genre': (Genres, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'titles': (Title, (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('year', 'year'),
+        ('category', 'category_id'),
+    )),
+    'genre_title': (GenreTitle, (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    )),
+    'review': (Review, (
+        ('id', 'id'),
+        ('title_id', 'title_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments': (Comment, (
+        ('id', 'id'),
+        ('review_id', 'review_id'),
+        ('text', 'text'),
+        ('author', 'author_id'),
+        ('pub_date', 'pub_date'),
+    )),
+}
+
+
+class Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def to_text(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+def iter_rows(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    model, columns = TABLES[table]
+    queryset = (
+        model.objects.order_by('pk')
+        .values_list(*(field for _, field in columns))
+    )
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield [to_text(value) for value in row]
+
+
+def iter_csv(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    _, columns = TABLES[table]
+    writer = csv.writer(Echo())
+    yield writer.writerow(header for header, _ in columns)
+    for row in iter_rows(table, chunk_size):
+        yield writer.writerow(row)
+
+
+def iter_ndjson(table, chunk_size=DEFAULT_CHUNK_SIZE):
+    _, columns = TABLES[table]
+    headers = [header for header, _ in columns]
+    for row in iter_rows(table, chunk_size):
+        yield json.dumps(dict(zip(headers, row)), ensure_ascii=False) + '\n'
+
+
+def iter_export(table, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    if export_format == 'csv':
+        return iter_csv(table, chunk_size)
+    return iter_ndjson(table, chunk_size)
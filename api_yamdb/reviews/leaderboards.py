@@ -0,0 +1,88 @@
+"""Материализованные рейтинги произведений.
+
+Таблица TitleRanking целиком пересобирается командой
+refresh_leaderboards; чтение страницы рейтинга — выборка по
+(board, position) без сортировки и агрегатов по каталогу.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from api_yamdb.settings import (LEADERBOARD_MIN_REVIEWS, LEADERBOARD_SIZE,
+                                LEADERBOARD_TRENDING_DAYS)
+
+from .models import GenreTitle, Review, Title, TitleRanking
+
+TOP = 'top'
+TRENDING = 'trending'
+
+
+def category_board(category_id):
+    return f'{TOP}:category:{category_id}'
+
+
+def genre_board(genre_id):
+    return f'{TOP}:genre:{genre_id}'
+
+
+def top_rated(size, min_reviews):
+    """Лучшие по рейтингу: общий список и списки по категориям и жанрам.
+
+    Каталог сортируется один раз, каждое произведение попадает во все
+    свои списки, пока те не заполнены.
+    """
+    genres = defaultdict(list)
+    for title_id, genre_id in (
+        GenreTitle.objects.values_list('title_id', 'genre_id').iterator()
+    ):
+        genres[title_id].append(genre_id)
+    boards = defaultdict(list)
+    titles = (
+        Title.objects.filter(reviews_count__gte=max(min_reviews, 1))
+        .order_by('-rating', '-reviews_count', 'id')
+        .values_list('id', 'category_id', 'rating')
+    )
+    for title_id, category_id, rating in titles.iterator():
+        keys = [TOP] + [genre_board(genre) for genre in genres[title_id]]
+        if category_id is not None:
+            keys.append(category_board(category_id))
+        for key in keys:
+            if len(boards[key]) < size:
+                boards[key].append((title_id, rating))
+    return boards
+
+
+def trending(size, days):
+    """Больше всего отзывов за последние days дней, в отзывах за день."""
+    since = timezone.now() - timedelta(days=days)
+    counts = (
+        Review.objects.filter(pub_date__gte=since)
+        .order_by()
+        .values('title')
+        .annotate(recent=Count('pk'))
+        .order_by('-recent', 'title')[:size]
+    )
+    return {
+        TRENDING: [(row['title'], row['recent'] / days) for row in counts]
+    }
+
+
+def refresh_leaderboards(size=LEADERBOARD_SIZE,
+                         min_reviews=LEADERBOARD_MIN_REVIEWS,
+                         trending_days=LEADERBOARD_TRENDING_DAYS):
+    """Пересобирает все рейтинги в одной транзакции; возвращает число мест."""
+    boards = top_rated(size, min_reviews)
+    boards.update(trending(size, trending_days))
+    rankings = [
+        TitleRanking(board=board, position=position, title_id=title_id,
+                     score=score)
+        for board, entries in boards.items()
+        for position, (title_id, score) in enumerate(entries, start=1)
+    ]
+    with transaction.atomic():
+        TitleRanking.objects.all().delete()
+        TitleRanking.objects.bulk_create(rankings)
+    return len(rankings)
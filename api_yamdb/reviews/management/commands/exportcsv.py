@@ -0,0 +1,38 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from reviews.export import DEFAULT_CHUNK_SIZE, FORMATS, TABLES, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает таблицы в формате static/data/*.csv.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Каталог для выгрузки.')
+        parser.add_argument(
+            '--format', dest='export_format', choices=FORMATS, default='csv',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Число строк, читаемых из БД за раз.',
+        )
+        parser.add_argument(
+            '--table', action='append', choices=tuple(TABLES),
+            help='Выгрузить только указанные таблицы.',
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options['path'], exist_ok=True)
+        export_format = options['export_format']
+        for table in options['table'] or TABLES:
+            path = os.path.join(options['path'], f'{table}.{export_format}')
+            started = time.monotonic()
+            with open(path, 'w', encoding='UTF-8', newline='') as file:
+                for line in iter_export(
+                    table, export_format, options['chunk_size']
+                ):
+                    file.write(line)
+            self.stdout.write(
+                f'{path}: {time.monotonic() - started:.2f} с'
+            )
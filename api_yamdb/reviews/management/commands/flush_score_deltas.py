@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.ratings import flush_score_deltas
+
+
+class Command(BaseCommand):
+    help = ('Применяет отложенные оценки (RATING_WRITE_BEHIND) '
+            'с заданной периодичностью.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.RATING_FLUSH_INTERVAL,
+            help='Пауза между проходами, сек.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.RATING_FLUSH_BATCH_SIZE,
+            help='Событий в одной транзакции.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Применить накопленное и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                started = time.monotonic()
+                flushed = flush_score_deltas(options['batch_size'])
+                if flushed or options['once']:
+                    self.stdout.write(
+                        f'Применено оценок: {flushed}, '
+                        f'{time.monotonic() - started:.1f} с'
+                    )
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено')
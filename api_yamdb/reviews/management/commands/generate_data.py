@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reviews.bulkload import (chunked, get_writer_class, reset_sequences,
+                              rows_loaded)
+from reviews.ratings import rebuild_titles
+from reviews.synthetic import SyntheticData
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        'Добавляет в базу синтетических пользователей, произведения, '
+        'отзывы и комментарии для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=8)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель закона Ципфа для популярности произведений.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Число строк в одной пачке.',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['titles'], options['genres'],
+               options['categories']) < 1:
+            raise CommandError(
+                'Нужны хотя бы один пользователь, произведение, жанр '
+                'и категория.'
+            )
+        data = SyntheticData(
+            users=options['users'], titles=options['titles'],
+            reviews=options['reviews'], comments=options['comments'],
+            genres=options['genres'], categories=options['categories'],
+            skew=options['skew'], seed=options['seed'],
+        )
+        writer_class = get_writer_class()
+        loaded = []
+        for model, rows in data.tables():
+            self.load(writer_class(model), rows, options['batch_size'])
+            loaded.append(model)
+        reset_sequences(loaded)
+        rebuild_titles()
+        for model in loaded:
+            rows_loaded.send(sender=model)
+        self.stdout.write(self.style.SUCCESS('Генерация завершена'))
+
+    def load(self, writer, rows, batch_size):
+        started = time.monotonic()
+        count = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for chunk in chunked(rows, batch_size):
+                writer.write(cursor, chunk)
+                count += len(chunk)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{writer.model._meta.db_table}: {count} строк за '
+            f'{elapsed:.2f} с'
+        )
@@ -0,0 +1,140 @@
+import csv
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from reviews.bulkload import (chunked, get_writer_class, reset_sequences,
+                              rows_loaded)
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title, User)
+from reviews.ratings import rebuild_titles
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def parse_user(row):
+    return {
+        'id': row['id'],
+        'username': row['username'],
+        'email': row['email'],
+        'role': row['role'],
+        'bio': row['bio'],
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'password': make_password(None),
+    }
+
+
+def parse_name_slug(row):
+    return {'id': row['id'], 'name': row['name'], 'slug': row['slug']}
+
+
+def parse_title(row):
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'year': row['year'],
+        'category_id': row['category'] or None,
+        'updated': timezone.now(),
+    }
+
+
+def parse_genre_title(row):
+    return {
+        'id': row['id'],
+        'title_id': row['title_id'],
+        'genre_id': row['genre_id'],
+    }
+
+
+def parse_review(row):
+    pub_date = parse_datetime(row['pub_date'])
+    return {
+        'id': row['id'],
+        'title_id': row['title_id'],
+        'text': row['text'],
+        'author_id': row['author'],
+        'score': row['score'],
+        'pub_date': pub_date,
+        'updated': pub_date,
+    }
+
+
+def parse_comment(row):
+    pub_date = parse_datetime(row['pub_date'])
+    return {
+        'id': row['id'],
+        'review_id': row['review_id'],
+        'text': row['text'],
+        'author_id': row['author'],
+        'pub_date': pub_date,
+        'updated': pub_date,
+    }
+
+
+# Порядок загрузки соответствует зависимостям внешних ключей.
+TABLES = (
+    ('users.csv', User, parse_user),
+    ('category.csv', Categories, parse_name_slug),
+    ('genre.csv', Genres, parse_name_slug),
+    ('titles.csv', Title, parse_title),
+    ('genre_title.csv', GenreTitle, parse_genre_title),
+    ('review.csv', Review, parse_review),
+    ('comments.csv', Comment, parse_comment),
+)
+
+
+def read_rows(path, parse):
+    with open(path, encoding='UTF-8', newline='') as csv_file:
+        for row in csv.DictReader(csv_file):
+            yield parse(row)
+
+
+class Command(BaseCommand):
+    help = 'Загружает CSV из static/data в базу пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Число строк в одной пачке.',
+        )
+
+    def handle(self, *args, **options):
+        writer_class = get_writer_class()
+        loaded = []
+        for file_name, model, parse in TABLES:
+            path = os.path.join(options['path'], file_name)
+            if not os.path.exists(path):
+                raise CommandError(f'Файл не найден: {path}')
+            self.load(writer_class(model), path, parse, options['batch_size'])
+            loaded.append(model)
+        reset_sequences(loaded)
+        rebuild_titles()
+        for model in loaded:
+            rows_loaded.send(sender=model)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена'))
+
+    def load(self, writer, path, parse, batch_size):
+        started = time.monotonic()
+        rows = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for chunk in chunked(read_rows(path, parse), batch_size):
+                writer.write(cursor, chunk)
+                rows += len(chunk)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{os.path.basename(path)}: {rows} строк за {elapsed:.2f} с '
+            f'({rows / elapsed if elapsed else rows:.0f} строк/с)'
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from reviews.ratings import rebuild_titles
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинг, счётчики отзывов и статистику оценок '
+        'произведений.'
+    )
+
+    def handle(self, *args, **options):
+        updated = rebuild_titles()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}')
+        )
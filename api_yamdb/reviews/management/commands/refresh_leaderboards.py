@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает рейтинги произведений с заданной периодичностью.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.LEADERBOARD_REFRESH_INTERVAL,
+            help='Пауза между пересборками, сек.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Пересобрать рейтинги и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                started = time.monotonic()
+                rankings = refresh_leaderboards()
+                self.stdout.write(
+                    f'Мест в рейтингах: {rankings}, '
+                    f'{time.monotonic() - started:.1f} с'
+                )
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Остановлено')
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-18 16:39
+
+from django.db import migrations, models
+
+# icontains на PostgreSQL строится как UPPER("name"::text) LIKE UPPER(%s),
+# поэтому триграммный индекс берётся по тому же выражению.
+TRIGRAM_INDEXES = (
+    ('title_name_trgm_idx', 'reviews_title', 'name'),
+    ('genres_name_trgm_idx', 'reviews_genres', 'name'),
+    ('categories_name_trgm_idx', 'reviews_categories', 'name'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year'], name='title_year_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
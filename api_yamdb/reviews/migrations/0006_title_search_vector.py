@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-18 16:42
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_TRIGGER = '''
+CREATE OR REPLACE FUNCTION reviews_title_search_vector_update()
+RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A')
+        || setweight(
+            to_tsvector('russian', coalesce(NEW.description, '')), 'B'
+        );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reviews_title_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, description ON reviews_title
+FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector_update();
+
+UPDATE reviews_title SET name = name;
+
+CREATE INDEX title_search_vector_idx
+ON reviews_title USING gin (search_vector);
+'''
+
+DROP_TRIGGER = '''
+DROP INDEX IF EXISTS title_search_vector_idx;
+DROP TRIGGER IF EXISTS reviews_title_search_vector_trigger ON reviews_title;
+DROP FUNCTION IF EXISTS reviews_title_search_vector_update();
+'''
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_outgoing_mail'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='user',
+            old_name='confirmation_code',
+            new_name='confirmation_nonce',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='confirmation_nonce',
+            field=models.CharField(blank=True, editable=False, max_length=12, verbose_name='соль кодов подтверждения'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:02
+
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+RECENCY_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def recency_weight(moment):
+    # Копия reviews.ratings.recency_weight на момент миграции:
+    # веса от фиксированной даты, без опоры recent_anchor (см. 0014).
+    days = (moment - RECENCY_EPOCH).total_seconds() / (24 * 60 * 60)
+    return 2 ** (days / settings.TITLE_STATS_HALF_LIFE_DAYS)
+
+
+def fill_title_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    stats = {
+        title_id: defaultdict(int)
+        for title_id in Title.objects.values_list('pk', flat=True)
+    }
+    reviews = Review.objects.order_by().values_list(
+        'title_id', 'score', 'pub_date')
+    for title_id, score, pub_date in reviews.iterator():
+        weight = recency_weight(pub_date)
+        stats[title_id][f'score_{score}'] += 1
+        stats[title_id]['recent_score_sum'] += score * weight
+        stats[title_id]['recent_weight'] += weight
+    TitleStats.objects.bulk_create([
+        TitleStats(title_id=title_id, **fields)
+        for title_id, fields in stats.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_confirmation_nonce'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title', verbose_name='Произведение')),
+                ('recent_score_sum', models.FloatField(default=0, editable=False)),
+                ('recent_weight', models.FloatField(default=0, editable=False)),
+                ('score_1', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 10')),
+            ],
+            options={
+                'verbose_name': 'статистика оценок',
+                'verbose_name_plural': 'статистика оценок',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:19
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreDelta',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('title_id', models.PositiveIntegerField(verbose_name='Id произведения')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Оценка')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата отзыва')),
+                ('sign', models.SmallIntegerField(verbose_name='Знак')),
+                ('created', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Дата записи')),
+            ],
+            options={
+                'verbose_name': 'отложенная оценка',
+                'verbose_name_plural': 'отложенные оценки',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 16:30
+
+from django.db import migrations, models
+import reviews.utils
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_score_delta'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('user', 'пользователь'), ('moderator', 'важный пользователь, модератор'), ('admin', 'самый важный пользователь, администратор')], default='user', max_length=9),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='username',
+            field=models.CharField(max_length=150, unique=True, validators=[reviews.utils.validate_username], verbose_name='имя пользователя'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_user_role_username'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='titlestats',
+            name='recent_anchor',
+            field=models.FloatField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:53
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_change_seq(apps, schema_editor):
+    # Потребители помнят номера по id: старые записи сохраняют их.
+    Change = apps.get_model('reviews', 'Change')
+    Change.objects.update(seq=F('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_title_stats_anchor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='change',
+            name='seq',
+            field=models.BigIntegerField(editable=False, null=True, unique=True, verbose_name='Номер в журнале'),
+        ),
+        migrations.RunPython(fill_change_seq, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,10 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
-from api_yamdb.settings import (CONFIRMATION_CODE_LENGTH, EMAIL_MAX_LENGTH,
+from api_yamdb.settings import (CONFIRMATION_NONCE_LENGTH, EMAIL_MAX_LENGTH,
                                 FIRST_NAME_MAX_LENGTH, LAST_NAME_MAX_LENGTH,
                                 USERNAME_MAX_LENGTH)
 
@@ -50,9 +52,11 @@ class User(AbstractUser):
         unique=True,
     )
 
-    confirmation_code = models.CharField(
-        verbose_name='код подтверждения',
-        max_length=CONFIRMATION_CODE_LENGTH,
+    confirmation_nonce = models.CharField(
+        verbose_name='соль кодов подтверждения',
+        max_length=CONFIRMATION_NONCE_LENGTH,
+        blank=True,
+        editable=False,
     )
     first_name = models.CharField(
         max_length=FIRST_NAME_MAX_LENGTH,
@@ -97,6 +101,25 @@ class Genres(OnlyNameSlugModel):
         verbose_name_plural = ('жанры')
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def with_relations(self):
+        """Подгружает id жанров для сериализации без N+1.
+
+        Названия и слаги жанров и категорий берутся из снимка
+        каталога (api.snapshot), их таблицы не читаются.
+        """
+        return self.prefetch_related(genre_links()).defer('search_vector')
+
+
+def genre_links(lookup='genretitle_set'):
+    """Prefetch одних id жанров, см. Title.genre_ids."""
+    return models.Prefetch(
+        lookup,
+        queryset=GenreTitle.objects.only('title_id', 'genre_id'),
+    )
+
+
 class Title(models.Model):
     name = models.TextField()
     year = models.IntegerField(
@@ -108,13 +131,174 @@ class Title(models.Model):
     )
     genre = models.ManyToManyField(Genres, through='GenreTitle')
     description = models.TextField(blank=True, null=True)
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
+
+    @property
+    def genre_ids(self):
+        return [link.genre_id for link in self.genretitle_set.all()]
 
     class Meta:
         ordering = ('name',)
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+            models.Index(fields=['year'], name='title_year_idx'),
+        ]
         verbose_name = ('произведение')
         verbose_name_plural = ('произведения')
 
 
+SCORES = range(1, 11)
+
+
+class TitleStats(models.Model):
+    """Гистограмма оценок произведения, обновляется вместе с отзывами.
+
+    recent_score_sum и recent_weight — суммы оценок и весов, где вес
+    отзыва растёт со временем (см. reviews.ratings.recency_weight);
+    их отношение — среднее, в котором свежие отзывы весят больше.
+    Веса отсчитываются от recent_anchor — дней от RECENCY_EPOCH.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Произведение',
+    )
+    recent_score_sum = models.FloatField(default=0, editable=False)
+    recent_weight = models.FloatField(default=0, editable=False)
+    recent_anchor = models.FloatField(default=0, editable=False)
+
+    class Meta:
+        verbose_name = ('статистика оценок')
+        verbose_name_plural = ('статистика оценок')
+
+    def histogram(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+    @property
+    def count(self):
+        return sum(self.histogram().values())
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(
+            score * times for score, times in self.histogram().items()
+        ) / count
+
+    @property
+    def median(self):
+        count = self.count
+        if not count:
+            return None
+        middle = ((count - 1) // 2, count // 2)
+        values = []
+        seen = 0
+        for score, times in self.histogram().items():
+            values += [score for position in middle
+                       if seen <= position < seen + times]
+            seen += times
+        return sum(values) / len(values)
+
+    @property
+    def recent_mean(self):
+        if not self.count or self.recent_weight <= 0:
+            return None
+        return self.recent_score_sum / self.recent_weight
+
+    def __str__(self):
+        return f'Статистика: {self.title_id}'
+
+
+for score in SCORES:
+    TitleStats.add_to_class(f'score_{score}', models.PositiveIntegerField(
+        verbose_name=f'Оценок {score}',
+        default=0,
+        editable=False,
+    ))
+
+
+class TitleRanking(models.Model):
+    """Место произведения в рейтинге, см. reviews.leaderboards."""
+    board = models.CharField(verbose_name='Рейтинг', max_length=64)
+    position = models.PositiveIntegerField(verbose_name='Место')
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Произведение',
+    )
+    score = models.FloatField(verbose_name='Значение')
+
+    class Meta:
+        ordering = ('board', 'position')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['board', 'position'],
+                name='unique_board_position'
+            ),
+        ]
+        verbose_name = ('место в рейтинге')
+        verbose_name_plural = ('места в рейтингах')
+
+    def __str__(self):
+        return f'{self.board}: {self.position}'
+
+
+class ScoreDelta(models.Model):
+    """Отложенное изменение оценок произведения, см. reviews.ratings.
+
+    sign=1 — отзыв с оценкой score добавлен, -1 — убран. Внешнего
+    ключа нет: вставка не должна блокировать строку произведения.
+    """
+    id = models.BigAutoField(primary_key=True)
+    title_id = models.PositiveIntegerField(verbose_name='Id произведения')
+    score = models.PositiveSmallIntegerField(verbose_name='Оценка')
+    pub_date = models.DateTimeField(verbose_name='Дата отзыва')
+    sign = models.SmallIntegerField(verbose_name='Знак')
+    created = models.DateTimeField(
+        verbose_name='Дата записи',
+        default=timezone.now,
+        db_index=True,
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = ('отложенная оценка')
+        verbose_name_plural = ('отложенные оценки')
+
+    def __str__(self):
+        return f'{self.title_id}: {self.sign:+d} × {self.score}'
+
+
 class GenreTitle(models.Model):
     title = models.ForeignKey(
         Title,
@@ -150,6 +334,10 @@ class ReviewComment(models.Model):
         auto_now_add=True,
         verbose_name='Дата создания'
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         abstract = True
@@ -177,6 +365,12 @@ class Review(ReviewComment):
         verbose_name = ('отзыв')
         verbose_name_plural = ('отзывы')
         default_related_name = "reviews"
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -184,6 +378,11 @@ class Review(ReviewComment):
             )
         ]
 
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется сигналами в той же транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(ReviewComment):
     review = models.ForeignKey(
@@ -196,3 +395,111 @@ class Comment(ReviewComment):
         verbose_name = ('комментарий')
         verbose_name_plural = ('комментарии')
         default_related_name = "comments"
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
+
+
+class OutgoingMail(models.Model):
+    """Письмо в очереди на отправку (см. команду run_mail_worker)."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'ожидает отправки'),
+        (SENT, 'отправлено'),
+        (FAILED, 'не отправлено'),
+    ]
+
+    subject = models.CharField(verbose_name='Тема', max_length=255)
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(
+        verbose_name='Отправитель',
+        max_length=EMAIL_MAX_LENGTH,
+    )
+    to = models.TextField(verbose_name='Получатели через запятую')
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=max(len(status) for status, _ in STATUSES),
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки',
+        default=0,
+    )
+    next_attempt = models.DateTimeField(
+        verbose_name='Следующая попытка',
+        default=timezone.now,
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    sent = models.DateTimeField(
+        verbose_name='Дата отправки',
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        ordering = ('next_attempt', 'id')
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt'],
+                name='outgoing_mail_queue_idx',
+            ),
+        ]
+        verbose_name = ('исходящее письмо')
+        verbose_name_plural = ('исходящие письма')
+
+    def __str__(self):
+        return f'{self.subject} → {self.to}'
+
+
+class Change(models.Model):
+    """Запись журнала изменений, см. reviews.changes.
+
+    id раздаётся при вставке, а seq — после коммита транзакции, и
+    в порядке seq записи становятся видны: потребитель запоминает
+    последний прочитанный seq и запрашивает следующие.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTIONS = [
+        (CREATE, 'создание'),
+        (UPDATE, 'изменение'),
+        (DELETE, 'удаление'),
+    ]
+
+    id = models.BigAutoField(primary_key=True, verbose_name='Номер')
+    seq = models.BigIntegerField(
+        verbose_name='Номер в журнале',
+        null=True,
+        unique=True,
+        editable=False,
+    )
+    table = models.CharField(verbose_name='Таблица', max_length=32)
+    object_id = models.PositiveIntegerField(verbose_name='Id объекта')
+    action = models.CharField(
+        verbose_name='Действие',
+        max_length=max(len(action) for action, _ in ACTIONS),
+        choices=ACTIONS,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата изменения',
+        default=timezone.now,
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = ('изменение')
+        verbose_name_plural = ('журнал изменений')
+
+    def __str__(self):
+        return f'{self.id}: {self.action} {self.table} {self.object_id}'
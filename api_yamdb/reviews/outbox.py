@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingMail
+
+RECIPIENT_SEPARATOR = ','
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь; отправит его run_mail_worker."""
+    return OutgoingMail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        to=RECIPIENT_SEPARATOR.join(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return min(
+        settings.MAIL_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.MAIL_RETRY_MAX_DELAY,
+    )
+
+
+def claim_batch(batch_size):
+    """Письма, которые пора отправить; параллельные воркеры их пропустят."""
+    queryset = OutgoingMail.objects.filter(
+        status=OutgoingMail.PENDING,
+        next_attempt__lte=timezone.now(),
+    )
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset.order_by('next_attempt', 'id')[:batch_size])
+
+
+def mark_failed_attempt(mail, error):
+    mail.attempts += 1
+    mail.last_error = str(error)
+    if mail.attempts >= settings.MAIL_MAX_ATTEMPTS:
+        mail.status = OutgoingMail.FAILED
+    else:
+        mail.next_attempt = timezone.now() + timedelta(
+            seconds=retry_delay(mail.attempts)
+        )
+
+
+def send_batch(batch):
+    """Отправляет письма через одно соединение и отмечает результат."""
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as error:
+        for mail in batch:
+            mark_failed_attempt(mail, error)
+        return
+    try:
+        for mail in batch:
+            message = EmailMessage(
+                mail.subject, mail.body, mail.from_email,
+                mail.to.split(RECIPIENT_SEPARATOR),
+                connection=mail_connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                mark_failed_attempt(mail, error)
+            else:
+                mail.status = OutgoingMail.SENT
+                mail.sent = timezone.now()
+    finally:
+        mail_connection.close()
+
+
+def deliver_batch(batch_size):
+    """Отправляет пачку писем из очереди.
+
+    Возвращает число отправленных писем и неудачных попыток.
+    """
+    with transaction.atomic():
+        batch = claim_batch(batch_size)
+        if batch:
+            send_batch(batch)
+            OutgoingMail.objects.bulk_update(batch, (
+                'status', 'attempts', 'next_attempt', 'last_error', 'sent',
+            ))
+    sent = sum(mail.status == OutgoingMail.SENT for mail in batch)
+    return sent, len(batch) - sent
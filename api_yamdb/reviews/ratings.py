@@ -0,0 +1,366 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, IntegerField,
+                              OuterRef, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce, Greatest, Now, Power
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .bulkload import chunked
+from .models import SCORES, Review, ScoreDelta, Title, TitleStats
+
+# Вес отзыва удваивается за период полураспада. Суммы весов в строке
+# TitleStats хранятся относительно её опорной даты recent_anchor
+# (дни от RECENCY_EPOCH), и опора сдвигается к самому свежему отзыву:
+# показатели степени никогда не положительны, float не переполняется,
+# а старые отзывы не копят огромные веса, которые потом вычитаются.
+RECENCY_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# Показатель степени не меньше -RECENCY_CUTOFF: вклад ниже точности
+# float, а PostgreSQL на исчезающе малых power() падает с underflow.
+RECENCY_CUTOFF = 60
+
+RATING_EXPRESSION = Case(
+    When(reviews_count=0, then=Value(None)),
+    default=Cast('score_sum', FloatField()) / F('reviews_count'),
+    output_field=FloatField(),
+)
+
+
+# Дельты применены в обход сигналов моделей: сбросить кэш произведений.
+# titles — id затронутых произведений, None — все.
+ratings_flushed = Signal()
+
+
+def apply_title_score_deltas(deltas):
+    """Сдвигает счётчики оценок произведений и пересчитывает рейтинг.
+
+    deltas: {title_id: (score_delta, count_delta)}.
+    """
+    def by_title(position):
+        return Case(
+            *(When(pk=title_id, then=Value(delta[position]))
+              for title_id, delta in deltas.items()),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+    if not deltas:
+        return
+    titles = Title.objects.filter(pk__in=deltas)
+    titles.update(
+        score_sum=F('score_sum') + by_title(0),
+        reviews_count=F('reviews_count') + by_title(1),
+        updated=Now(),
+    )
+    titles.update(rating=RATING_EXPRESSION)
+
+
+def rebuild_title_ratings(titles=None):
+    """Пересчитывает счётчики оценок по таблице отзывов."""
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = (
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+    )
+    return titles.update(
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total'),
+                     output_field=IntegerField()),
+            0,
+        ),
+        reviews_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total'),
+                     output_field=IntegerField()),
+            0,
+        ),
+        rating=Subquery(
+            reviews.annotate(average=Avg('score')).values('average'),
+            output_field=FloatField(),
+        ),
+        updated=Now(),
+    )
+
+
+def recency_days(moment):
+    return (moment - RECENCY_EPOCH).total_seconds() / (24 * 60 * 60)
+
+
+def recency_weight(days, anchor):
+    """Вес отзыва за days относительно опоры anchor (days <= anchor)."""
+    exponent = (days - anchor) / settings.TITLE_STATS_HALF_LIFE_DAYS
+    return 2 ** max(exponent, -RECENCY_CUTOFF)
+
+
+def recency_sums(events):
+    """Опора и суммы оценок и весов для [(дни, оценка, знак)]."""
+    anchor = max(days for days, _, _ in events)
+    score_sum = weight_sum = 0.0
+    for days, score, sign in events:
+        weight = recency_weight(days, anchor)
+        score_sum += sign * score * weight
+        weight_sum += sign * weight
+    return anchor, score_sum, weight_sum
+
+
+def add_review_stats(deltas, title_id, score, pub_date, sign=1):
+    """Добавляет (sign=1) или убирает (sign=-1) отзыв в дельтах статистики.
+
+    deltas: {title_id: {поле TitleStats: приращение, 'recent': события}}.
+    """
+    title_deltas = deltas[title_id]
+    title_deltas[f'score_{score}'] += sign
+    title_deltas['recent'].append((recency_days(pub_date), score, sign))
+
+
+def review_stats_deltas():
+    return defaultdict(lambda: defaultdict(int, recent=[]))
+
+
+def decay(days):
+    """SQL-выражение 2 ** (days / период) для days <= 0."""
+    return Power(Value(2.0), Greatest(
+        days / Value(settings.TITLE_STATS_HALF_LIFE_DAYS),
+        Value(float(-RECENCY_CUTOFF)),
+    ))
+
+
+def by_title(deltas, values, default):
+    return Case(
+        *(When(pk=title_id, then=Value(values[title_id]))
+          for title_id in deltas),
+        default=default,
+        output_field=FloatField(),
+    )
+
+
+def recent_updates(deltas):
+    """Сдвиг опоры и сумм весов одной строкой UPDATE на все произведения.
+
+    Опора становится max(старая, самый свежий отзыв пачки), а старые
+    суммы и вклад пачки приводятся к ней множителями не больше 1.
+    В правой части UPDATE recent_anchor — ещё старое значение.
+    """
+    sums = {
+        title_id: recency_sums(title_deltas['recent'])
+        for title_id, title_deltas in deltas.items()
+    }
+    anchor = by_title(
+        deltas, {title_id: item[0] for title_id, item in sums.items()},
+        F('recent_anchor'),
+    )
+    new_anchor = Greatest(F('recent_anchor'), anchor)
+    old_decay = decay(F('recent_anchor') - new_anchor)
+    batch_decay = decay(anchor - new_anchor)
+    return {
+        'recent_anchor': new_anchor,
+        'recent_score_sum': F('recent_score_sum') * old_decay + by_title(
+            deltas, {title_id: item[1] for title_id, item in sums.items()},
+            Value(0.0),
+        ) * batch_decay,
+        'recent_weight': F('recent_weight') * old_decay + by_title(
+            deltas, {title_id: item[2] for title_id, item in sums.items()},
+            Value(0.0),
+        ) * batch_decay,
+    }
+
+
+def apply_title_stats_deltas(deltas):
+    """Сдвигает строки TitleStats одним UPDATE на все произведения.
+
+    Если строки нет, а отзыв добавляется (произведение загружено
+    в обход сигналов), она строится заново по таблице отзывов.
+    """
+    if not deltas:
+        return
+    fields = {
+        field for title_deltas in deltas.values()
+        for field, delta in title_deltas.items()
+        if field != 'recent' and delta
+    }
+    updates = recent_updates(deltas)
+    for field in fields:
+        output_field = TitleStats._meta.get_field(field)
+        updates[field] = F(field) + Case(
+            *(When(pk=title_id, then=Value(title_deltas[field]))
+              for title_id, title_deltas in deltas.items()
+              if title_deltas[field]),
+            default=Value(0),
+            output_field=output_field,
+        )
+    updated = TitleStats.objects.filter(pk__in=deltas).update(**updates)
+    if updated == len(deltas):
+        return
+    # Для убранных отзывов строку не создаём: произведение может удаляться.
+    growing = [
+        title_id for title_id, title_deltas in deltas.items()
+        if sum(title_deltas[f'score_{score}'] for score in SCORES) > 0
+    ]
+    rebuild_title_stats(
+        Title.objects.filter(pk__in=growing, stats__isnull=True)
+    )
+
+
+def apply_review_events(events):
+    """Применяет добавления и удаления оценок к счётчикам и статистике.
+
+    events: (title_id, score, pub_date, sign), sign=1 — отзыв
+    добавлен, -1 — убран. Дельты копятся по произведениям, так что
+    на все события уходит по одному UPDATE на таблицу.
+    """
+    scores = defaultdict(lambda: [0, 0])
+    stats = review_stats_deltas()
+    for title_id, score, pub_date, sign in events:
+        scores[title_id][0] += sign * score
+        scores[title_id][1] += sign
+        add_review_stats(stats, title_id, score, pub_date, sign)
+    apply_title_score_deltas({
+        title_id: delta for title_id, delta in scores.items() if any(delta)
+    })
+    apply_title_stats_deltas(stats)
+
+
+def record_review_events(events):
+    """Применяет события сразу или, при RATING_WRITE_BEHIND, откладывает.
+
+    Отложенные события пишутся в ScoreDelta, строки произведений
+    не блокируются; их применяет flush_score_deltas.
+    """
+    if not settings.RATING_WRITE_BEHIND:
+        apply_review_events(events)
+        return
+    ScoreDelta.objects.bulk_create([
+        ScoreDelta(title_id=title_id, score=score, pub_date=pub_date,
+                   sign=sign)
+        for title_id, score, pub_date, sign in events
+    ])
+
+
+def flush_score_deltas(batch_size=None, before=None):
+    """Применяет отложенные события пачками, возвращает их число.
+
+    Пачка применяется и удаляется в одной транзакции, поэтому
+    каждое событие учитывается ровно один раз; параллельные
+    воркеры пропускают заблокированные строки. Применяются события,
+    записанные не позже before (по умолчанию — момента вызова).
+    """
+    batch_size = batch_size or settings.RATING_FLUSH_BATCH_SIZE
+    # Граница не сдвигается, чтобы поток новых отзывов не держал цикл.
+    queryset = ScoreDelta.objects.filter(
+        created__lte=before or timezone.now(),
+    ).order_by('pk')
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    flushed = 0
+    while True:
+        with transaction.atomic():
+            batch = list(queryset.values_list(
+                'pk', 'title_id', 'score', 'pub_date', 'sign',
+            )[:batch_size])
+            if not batch:
+                return flushed
+            apply_review_events([event for _, *event in batch])
+            ScoreDelta.objects.filter(
+                pk__in=[pk for pk, *_ in batch]
+            ).delete()
+            ratings_flushed.send(
+                sender=Title, titles={title_id for _, title_id, *_ in batch},
+            )
+        flushed += len(batch)
+
+
+def flush_stale_score_deltas(max_staleness=None):
+    """Применяет события старше max_staleness секунд, если они есть.
+
+    Вызывается при чтении произведений: даже если воркер отстал или
+    остановлен, рейтинг в ответе учитывает все отзывы старше этого.
+    """
+    if max_staleness is None:
+        max_staleness = settings.RATING_MAX_STALENESS
+    before = timezone.now() - timedelta(seconds=max_staleness)
+    # Вьюха к этому моменту уже читает с реплики; отложенные события
+    # проверяются на основной базе, иначе отставание реплики
+    # прибавлялось бы к max_staleness.
+    pending = ScoreDelta.objects.using(DEFAULT_DB_ALIAS)
+    if not pending.filter(created__lte=before).exists():
+        return 0
+    return flush_score_deltas(before=before)
+
+
+def title_stats_row(title_id, title_deltas):
+    if not title_deltas:
+        return TitleStats(title_id=title_id)
+    recent = title_deltas.pop('recent')
+    anchor, score_sum, weight_sum = recency_sums(recent)
+    return TitleStats(
+        title_id=title_id, recent_anchor=anchor,
+        recent_score_sum=score_sum, recent_weight=weight_sum,
+        **title_deltas,
+    )
+
+
+def rebuild_title_stats(titles=None, batch_size=1000):
+    """Пересчитывает TitleStats по таблице отзывов."""
+    if titles is None:
+        titles = Title.objects.all()
+    rebuilt = 0
+    title_ids = list(titles.order_by('pk').values_list('pk', flat=True))
+    for chunk in chunked(title_ids, batch_size):
+        deltas = review_stats_deltas()
+        reviews = (
+            Review.objects.filter(title__in=chunk).order_by()
+            .values_list('title_id', 'score', 'pub_date')
+        )
+        for title_id, score, pub_date in reviews.iterator():
+            add_review_stats(deltas, title_id, score, pub_date)
+        TitleStats.objects.filter(pk__in=chunk).delete()
+        TitleStats.objects.bulk_create([
+            title_stats_row(title_id, deltas.get(title_id))
+            for title_id in chunk
+        ])
+        rebuilt += len(chunk)
+    return rebuilt
+
+
+def lock_review_writes():
+    """До конца транзакции блокирует запись отзывов и ScoreDelta.
+
+    Чтения не блокируются. Отзыв, записанный в обход блокировки,
+    попал бы и в пересчёт, и в отложенные события.
+    """
+    if connection.vendor != 'postgresql':
+        # SQLite и так пускает одного пишущего на всю базу.
+        return
+    tables = ', '.join(
+        connection.ops.quote_name(model._meta.db_table)
+        for model in (Review, ScoreDelta)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {tables} IN SHARE ROW EXCLUSIVE MODE')
+
+
+def rebuild_titles(titles=None):
+    """Пересчитывает рейтинг и статистику, возвращает число произведений.
+
+    Пересчёт по таблице отзывов уже учитывает отложенные события,
+    поэтому они удаляются в той же транзакции — иначе
+    flush_score_deltas применил бы их второй раз.
+    """
+    with transaction.atomic():
+        lock_review_writes()
+        pending = ScoreDelta.objects.all()
+        if titles is not None:
+            pending = pending.filter(title_id__in=titles.values('pk'))
+        pending.delete()
+        rebuild_title_stats(titles)
+        # Кэши сбрасываются после коммита, см. api.signals.
+        ratings_flushed.send(
+            sender=Title,
+            titles=None if titles is None else set(
+                titles.values_list('pk', flat=True)),
+        )
+        return rebuild_title_ratings(titles)
@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Count, F, Max
+from django.utils.module_loading import import_string
+
+from .models import Title
+from .stemmer import tokenize
+
+SEARCH_CONFIG = 'russian'
+
+# Веса полей как у setweight: название 'A', описание 'B'.
+FIELD_WEIGHTS = {'name': 1.0, 'description': 0.4}
+
+# Версия обратного индекса: её сдвигает запись произведения в любом процессе.
+INDEX_VERSION_KEY = 'search:titles:version'
+# Сколько id ранжированного списка проверяется фильтрами за один запрос.
+RANKED_CHUNK_SIZE = 500
+
+
+class PostgresTitleSearch:
+    """Полнотекстовый поиск по search_vector с GIN-индексом.
+
+    Вектор заполняет триггер БД (см. миграцию), поэтому он актуален
+    и для вставок в обход моделей, например COPY в importcsv.
+    """
+
+    in_memory = False
+
+    def search(self, queryset, text):
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F('search_vector'), query))
+            .order_by('-search_rank', 'id')
+        )
+
+    def index_title(self, title):
+        pass
+
+    def remove_title(self, title_id):
+        pass
+
+
+def index_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def bump_index_version():
+    cache = index_cache()
+    try:
+        cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(INDEX_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+class InvertedIndexTitleSearch:
+    """Обратный индекс в памяти процесса для баз без полнотекстового поиска.
+
+    Изменения в своём процессе приходят сигналами Title. Изменения
+    из других процессов подтягиваются по отметке (максимальная дата
+    изменения, число произведений), но только после сдвига версии
+    индекса в кэше и не реже раза в CATALOG_CACHE_TIMEOUT секунд —
+    так доходят и вставки в обход сигналов.
+
+    Список результатов ранжируется и режется на страницы в Python
+    (см. ranked_ids), из БД читается только страница.
+    """
+    in_memory = True
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.stamp = None
+        self.version = None
+        self.synced = None
+
+    def _index(self, title_id, name, description):
+        self._remove(title_id)
+        weights = defaultdict(float)
+        for field, value in (('name', name), ('description', description)):
+            for term in tokenize(value):
+                weights[term] += FIELD_WEIGHTS[field]
+        for term, weight in weights.items():
+            self.postings[term][title_id] = weight
+        self.documents[title_id] = tuple(weights)
+
+    def _remove(self, title_id):
+        for term in self.documents.pop(title_id, ()):
+            self.postings[term].pop(title_id, None)
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def _current_stamp(self):
+        stamp = Title.objects.aggregate(
+            updated=Max('updated'), count=Count('pk')
+        )
+        return stamp['updated'], stamp['count']
+
+    def _current_version(self):
+        cache = index_cache()
+        version = cache.get(INDEX_VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            cache.add(INDEX_VERSION_KEY, version, timeout=None)
+        return version
+
+    def _sync(self):
+        version = self._current_version()
+        if (
+            self.version == version
+            and time.monotonic() - self.synced < settings.CATALOG_CACHE_TIMEOUT
+        ):
+            return
+        self.version, self.synced = version, time.monotonic()
+        updated, count = self._current_stamp()
+        if self.stamp == (updated, count):
+            return
+        titles = Title.objects.values_list('id', 'name', 'description')
+        if self.stamp is not None and self.stamp[0] is not None:
+            titles = titles.filter(updated__gte=self.stamp[0])
+        for title_id, name, description in titles.iterator():
+            self._index(title_id, name, description)
+        if len(self.documents) != count:
+            self.postings.clear()
+            self.documents.clear()
+            for title_id, name, description in (
+                Title.objects.values_list('id', 'name', 'description')
+                .iterator()
+            ):
+                self._index(title_id, name, description)
+        self.stamp = (updated, count)
+
+    def rank(self, text):
+        terms = set(tokenize(text))
+        if not terms:
+            return []
+        with self.lock:
+            self._sync()
+            postings = [self.postings.get(term, {}) for term in terms]
+            matches = set.intersection(*map(set, postings))
+            scores = {
+                title_id: sum(posting[title_id] for posting in postings)
+                for title_id in matches
+            }
+        return sorted(scores, key=lambda title_id: (-scores[title_id],
+                                                    title_id))
+
+    def search(self, queryset, text):
+        """Только отбор, без порядка: списки ранжирует ranked_ids."""
+        ranked = self.rank(text)
+        if not ranked:
+            return queryset.none()
+        return queryset.filter(pk__in=ranked)
+
+    def index_title(self, title):
+        with self.lock:
+            if self.stamp is not None:
+                self._index(title.pk, title.name, title.description)
+        transaction.on_commit(bump_index_version)
+
+    def remove_title(self, title_id):
+        with self.lock:
+            if self.stamp is not None:
+                self._remove(title_id)
+        transaction.on_commit(bump_index_version)
+
+
+def ranked_ids(queryset, ranking):
+    """Id из ranking, прошедшие фильтры queryset.
+
+    Порядок — ранг или явный order_by выборки (?ordering=). Без
+    фильтров и сортировки запросов нет; иначе id проверяются пачками
+    по RANKED_CHUNK_SIZE, чтобы размер SQL не рос с числом совпадений.
+    """
+    ordering = queryset.query.order_by
+    if not queryset.query.has_filters() and not ordering:
+        return ranking
+    fields = [name.lstrip('-') for name in ordering]
+    rows = {}
+    for start in range(0, len(ranking), RANKED_CHUNK_SIZE):
+        chunk = ranking[start:start + RANKED_CHUNK_SIZE]
+        for pk, *values in queryset.filter(pk__in=chunk).order_by(
+        ).values_list('pk', *fields):
+            rows[pk] = values
+    matched = [pk for pk in ranking if pk in rows]
+    # Устойчивая сортировка с последнего ключа: при равенстве — ранг.
+    for index in reversed(range(len(fields))):
+        matched.sort(
+            key=lambda pk: rows[pk][index],
+            reverse=ordering[index].startswith('-'),
+        )
+    return matched
+
+
+def ranked_page(queryset, ids):
+    """Объекты страницы в порядке ids одним запросом."""
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """Бэкенд из TITLE_SEARCH_BACKEND, иначе — по типу базы."""
+    if settings.TITLE_SEARCH_BACKEND:
+        return import_string(settings.TITLE_SEARCH_BACKEND)()
+    if connection.vendor == 'postgresql':
+        return PostgresTitleSearch()
+    return InvertedIndexTitleSearch()
@@ -0,0 +1,111 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from .bulkload import rows_loaded
+from .changes import TABLE_NAMES, is_tracked, log_change, log_changes
+from .models import Categories, Change, GenreTitle, Review, Title, TitleStats
+from .ratings import record_review_events
+from .search import bump_index_version, get_search_backend
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, raw, **kwargs):
+    instance._previous_score = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_score = (
+        Review.objects.filter(pk=instance.pk)
+        .values_list('title_id', 'score')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def apply_review_score(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_score', None)
+    if previous == (instance.title_id, instance.score):
+        return
+    events = []
+    if previous is not None:
+        title_id, score = previous
+        events.append((title_id, score, instance.pub_date, -1))
+    events.append(
+        (instance.title_id, instance.score, instance.pub_date, 1)
+    )
+    record_review_events(events)
+
+
+@receiver(post_delete, sender=Review)
+def revoke_review_score(sender, instance, **kwargs):
+    record_review_events([
+        (instance.title_id, instance.score, instance.pub_date, -1),
+    ])
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        TitleStats.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, raw, **kwargs):
+    if not raw:
+        get_search_backend().index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    get_search_backend().remove_title(instance.pk)
+
+
+@receiver(rows_loaded, sender=Title)
+def reindex_loaded_titles(sender, **kwargs):
+    # Индексы всех процессов дочитают вставленные строки по версии.
+    bump_index_version()
+
+
+def log_saved(sender, instance, created, raw, update_fields=None, **kwargs):
+    if raw or not is_tracked(sender, update_fields):
+        return
+    action = Change.CREATE if created else Change.UPDATE
+    log_change(sender, instance.pk, action)
+
+
+def log_deleted(sender, instance, **kwargs):
+    # Удаление связей жанров через remove() и clear() тоже приходит сюда.
+    log_change(sender, instance.pk, Change.DELETE)
+
+
+for model in TABLE_NAMES:
+    post_save.connect(
+        log_saved, sender=model,
+        dispatch_uid=f'log_saved_{model._meta.label_lower}')
+    post_delete.connect(
+        log_deleted, sender=model,
+        dispatch_uid=f'log_deleted_{model._meta.label_lower}')
+
+
+@receiver(pre_delete, sender=Categories)
+def log_category_unset(sender, instance, **kwargs):
+    # SET_NULL обнуляет category_id одним UPDATE, без сигналов Title.
+    log_changes(
+        Title,
+        Title.objects.filter(category=instance).values_list('pk', flat=True),
+        Change.UPDATE,
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def log_genre_links(sender, instance, action, reverse, pk_set, **kwargs):
+    # add() вставляет связи через bulk_create, без post_save.
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        links = GenreTitle.objects.filter(genre=instance, title__in=pk_set)
+    else:
+        links = GenreTitle.objects.filter(title=instance, genre__in=pk_set)
+    log_changes(GenreTitle, links.values_list('pk', flat=True), Change.CREATE)
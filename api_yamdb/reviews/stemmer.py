@@ -0,0 +1,117 @@
+"""Стеммер Snowball для русского языка.
+
+Используется запасным поиском, когда база не PostgreSQL и словарь
+'russian' из to_tsvector недоступен.
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ('ся', 'сь')
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+)
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+WORD_RE = re.compile(r'\w+')
+
+
+def _by_length(endings):
+    return sorted(endings, key=len, reverse=True)
+
+
+def _strip(word, endings, start):
+    """Отрезает самое длинное окончание, лежащее в word[start:]."""
+    for ending in _by_length(endings):
+        if word.endswith(ending) and len(word) - len(ending) >= start:
+            return word[:-len(ending)]
+    return None
+
+
+def _strip_grouped(word, groups, start):
+    """Как _strip, но окончания первой группы должны идти после а/я."""
+    first, second = groups
+    for ending in _by_length(first + second):
+        if not word.endswith(ending) or len(word) - len(ending) < start:
+            continue
+        stem = word[:-len(ending)]
+        if ending in second or stem[-1:] in ('а', 'я'):
+            return stem
+    return None
+
+
+def _regions(word):
+    rv = r1 = r2 = len(word)
+    for index, char in enumerate(word):
+        if char in VOWELS:
+            rv = index + 1
+            break
+    for index in range(1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r1 = index + 1
+            break
+    for index in range(r1 + 1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r2 = index + 1
+            break
+    return rv, r1, r2
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv, _, r2 = _regions(word)
+
+    result = _strip_grouped(word, PERFECTIVE_GERUND, rv)
+    if result is None:
+        word = _strip(word, REFLEXIVE, rv) or word
+        adjective = _strip(word, ADJECTIVE, rv)
+        if adjective is not None:
+            result = _strip_grouped(adjective, PARTICIPLE, rv) or adjective
+        else:
+            result = (
+                _strip_grouped(word, VERB, rv)
+                or _strip(word, NOUN, rv)
+            )
+    word = result if result is not None else word
+
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    word = _strip(word, DERIVATIONAL, r2) or word
+
+    if word.endswith('нн'):
+        return word[:-1]
+    superlative = _strip(word, SUPERLATIVE, rv)
+    if superlative is not None:
+        word = superlative
+        return word[:-1] if word.endswith('нн') else word
+    if word.endswith('ь'):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Разбивает текст на основы слов."""
+    return [stem(word) for word in WORD_RE.findall(text or '')]
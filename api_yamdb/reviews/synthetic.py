@@ -0,0 +1,182 @@
+"""Синтетические данные для нагрузочного тестирования.
+
+Популярность произведений и активность пользователей распределены
+по степенному закону: немногие произведения собирают большую часть
+отзывов, немногие пользователи пишут большую часть текстов.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import (Categories, Comment, Genres, GenreTitle, Review, Title,
+                     User)
+
+WORDS = (
+    'тень', 'ветер', 'город', 'море', 'ночь', 'дорога', 'песня', 'зима',
+    'сердце', 'остров', 'время', 'война', 'мир', 'дом', 'звезда', 'река',
+    'тайна', 'лето', 'огонь', 'память', 'небо', 'сад', 'путь', 'голос',
+)
+# Оценки смещены к 7–9, как на живых сайтах рецензий.
+SCORE_WEIGHTS = (1, 1, 2, 3, 5, 8, 12, 15, 12, 8)
+# Показатель степени для выбора «активных» пользователей и отзывов.
+ACTIVITY_POWER = 2
+HISTORY_DAYS = 730
+
+
+class SyntheticData:
+    """Генераторы строк для TableWriter в порядке внешних ключей."""
+
+    def __init__(self, users, titles, reviews, comments, genres=20,
+                 categories=8, skew=1.1, seed=0):
+        self.random = random.Random(seed)
+        self.sizes = {
+            User: users, Categories: categories, Genres: genres,
+            Title: titles, Review: min(reviews, users * titles),
+            Comment: comments,
+        }
+        self.skew = skew
+        self.now = timezone.now()
+        # Новые строки идут после существующих, чтобы не было конфликтов id.
+        self.offsets = {
+            model: model.objects.aggregate(last=Max('pk'))['last'] or 0
+            for model in (User, Categories, Genres, Title, GenreTitle,
+                          Review, Comment)
+        }
+        self.review_counts = self.popularity(
+            self.sizes[Review], titles, cap=users,
+        )
+        self.sizes[Review] = sum(self.review_counts)
+
+    def popularity(self, total, buckets, cap):
+        """Делит total по buckets по закону Ципфа, не больше cap в каждом."""
+        if not buckets or not cap:
+            return [0] * buckets
+        weights = [1 / (rank + 1) ** self.skew for rank in range(buckets)]
+        scale = total / sum(weights)
+        counts = [min(cap, int(weight * scale)) for weight in weights]
+        left = total - sum(counts)
+        rank = 0
+        while left > 0:
+            if counts[rank % buckets] < cap:
+                counts[rank % buckets] += 1
+                left -= 1
+            rank += 1
+        # Популярность не должна совпадать с порядком id.
+        self.random.shuffle(counts)
+        return counts
+
+    def skewed_index(self, size):
+        return int(size * self.random.random() ** ACTIVITY_POWER)
+
+    def pick_authors(self, count):
+        users = self.sizes[User]
+        if count * 2 > users:
+            return self.random.sample(range(users), count)
+        chosen = set()
+        while len(chosen) < count:
+            chosen.add(self.skewed_index(users))
+        return chosen
+
+    def words(self, count):
+        return ' '.join(self.random.choices(WORDS, k=count))
+
+    def moment(self):
+        return self.now - timedelta(
+            seconds=self.random.randrange(HISTORY_DAYS * 24 * 60 * 60)
+        )
+
+    def new_ids(self, model):
+        start = self.offsets[model] + 1
+        return range(start, start + self.sizes.get(model, 0))
+
+    def user_rows(self):
+        password = make_password(None)
+        for user_id in self.new_ids(User):
+            yield {
+                'id': user_id,
+                'username': f'synthetic{user_id}',
+                'email': f'synthetic{user_id}@example.com',
+                'role': User.USER,
+                'password': password,
+            }
+
+    def name_slug_rows(self, model, prefix):
+        for row_id in self.new_ids(model):
+            yield {
+                'id': row_id,
+                'name': f'{self.words(2).capitalize()} {row_id}',
+                'slug': f'{prefix}-{row_id}',
+            }
+
+    def title_rows(self):
+        categories = self.new_ids(Categories)
+        for title_id in self.new_ids(Title):
+            yield {
+                'id': title_id,
+                'name': f'{self.words(3).capitalize()} {title_id}',
+                'year': self.random.randint(1900, self.now.year),
+                'category_id': self.random.choice(categories),
+                'description': self.words(12),
+                'updated': self.now,
+            }
+
+    def genre_title_rows(self):
+        genres = self.new_ids(Genres)
+        row_id = self.offsets[GenreTitle]
+        for title_id in self.new_ids(Title):
+            for genre_id in self.random.sample(
+                genres, min(len(genres), self.random.randint(1, 3))
+            ):
+                row_id += 1
+                yield {'id': row_id, 'title_id': title_id,
+                       'genre_id': genre_id}
+
+    def review_rows(self):
+        review_ids = iter(self.new_ids(Review))
+        first_user = self.offsets[User] + 1
+        for title_id, count in zip(self.new_ids(Title), self.review_counts):
+            for author in self.pick_authors(count):
+                pub_date = self.moment()
+                yield {
+                    'id': next(review_ids),
+                    'title_id': title_id,
+                    'author_id': first_user + author,
+                    'text': self.words(20),
+                    'score': self.random.choices(
+                        range(1, 11), SCORE_WEIGHTS)[0],
+                    'pub_date': pub_date,
+                    'updated': pub_date,
+                }
+
+    def comment_rows(self):
+        reviews = self.sizes[Review]
+        if not reviews:
+            return
+        first_review = self.offsets[Review] + 1
+        first_user = self.offsets[User] + 1
+        for comment_id in self.new_ids(Comment):
+            pub_date = self.moment()
+            yield {
+                'id': comment_id,
+                'review_id': first_review + self.skewed_index(reviews),
+                'author_id': first_user + self.skewed_index(
+                    self.sizes[User]),
+                'text': self.words(8),
+                'pub_date': pub_date,
+                'updated': pub_date,
+            }
+
+    def tables(self):
+        """(модель, строки) в порядке зависимостей внешних ключей."""
+        return (
+            (User, self.user_rows()),
+            (Categories, self.name_slug_rows(Categories, 'category')),
+            (Genres, self.name_slug_rows(Genres, 'genre')),
+            (Title, self.title_rows()),
+            (GenreTitle, self.genre_title_rows()),
+            (Review, self.review_rows()),
+            (Comment, self.comment_rows()),
+        )
@@ -1,9 +1,40 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_smtp',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    # В CI нет PostgreSQL: тесты с базой работают на SQLite в памяти.
+    from django.conf import settings
+    from django.db import connections
+    connections.__dict__['databases'] = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+        # Вторая база для проверки чтения с реплик, см. test_replicas.py.
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+    }
+    # Тестовую базу реплики Django ищет и в settings.DATABASES.
+    settings.DATABASES['replica'] = connections.databases['replica']
+    del connections['default']
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
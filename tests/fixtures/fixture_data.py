@@ -0,0 +1,61 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Categories
+    return Categories.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genre():
+    from reviews.models import Genres
+    return Genres.objects.create(name='Драма', slug='drama')
+
+
+@pytest.fixture
+def title(category, genre):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category,
+        description='Фильм о надежде',
+    )
+    title.genre.add(genre)
+    return title
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='bingobongo', email='bingobongo@yamdb.fake',
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='capt_obvious', email='capt_obvious@yamdb.fake',
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='yamdb_admin', email='admin@yamdb.fake', role='admin',
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    from rest_framework.test import APIClient
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
@@ -0,0 +1,65 @@
+import socketserver
+import threading
+from email import message_from_bytes
+
+import pytest
+
+
+class DummySMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и запоминает их."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply('220 localhost ESMTP dummy')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().split(' ', 1)[0].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply('250 localhost')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''
+                for data_line in self.rfile:
+                    if data_line == b'.\r\n':
+                        break
+                    data += data_line
+                if server.reject:
+                    self.reply('554 Transaction failed')
+                else:
+                    server.messages.append(message_from_bytes(data))
+                    self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class DummySMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), DummySMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.reject = False
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = DummySMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    settings.EMAIL_USE_TLS = False
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from api_yamdb.asgi import WSGIThreadPoolApplication, application
+from reviews.models import User
+
+
+def scope(method='GET', path='/', query=b'', headers=()):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': [(b'host', b'localhost'), *headers],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 5000),
+    }
+
+
+async def call(app, request_scope, body=b''):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(request_scope, receive, send)
+    start, *chunks = messages
+    return start['status'], dict(start['headers']), [
+        chunk['body'] for chunk in chunks
+    ]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestASGIApplication:
+
+    def test_matches_wsgi_response(self, client, title):
+        status, headers, chunks = run(call(
+            application,
+            scope(path='/api/v1/titles/', query=b'fields=id,name'),
+        ))
+        assert status == 200
+        assert headers[b'content-type'] == b'application/json'
+        assert json.loads(b''.join(chunks)) == client.get(
+            '/api/v1/titles/', {'fields': 'id,name'}, HTTP_HOST='localhost',
+        ).json(), 'Проверьте, что ASGI отдаёт тот же ответ, что и WSGI'
+
+    def test_request_body(self):
+        body = json.dumps(
+            {'username': 'asgi_user', 'email': 'asgi@example.com'}
+        ).encode()
+        status, _, _ = run(call(application, scope(
+            'POST', '/api/v1/auth/signup/',
+            headers=[(b'content-type', b'application/json'),
+                     (b'content-length', str(len(body)).encode())],
+        ), body))
+        assert status == 200, (
+            'Проверьте, что тело запроса доходит до Django'
+        )
+        assert User.objects.filter(username='asgi_user').exists()
+
+
+class TestThreadPool:
+
+    def test_threads_are_bounded(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def slow_app(environ, start_response):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [environ['PATH_INFO'].encode(), b'!']
+
+        app = WSGIThreadPoolApplication(slow_app, threads=2)
+
+        async def many():
+            return await asyncio.gather(*(
+                call(app, scope(path=f'/{number}')) for number in range(6)
+            ))
+
+        responses = run(many())
+        assert [b''.join(chunks) for _, _, chunks in responses] == [
+            f'/{number}!'.encode() for number in range(6)
+        ]
+        assert max(peak) == 2, (
+            'Проверьте, что Django выполняется не больше чем в ASGI_THREADS '
+            'потоках одновременно'
+        )
+
+    def test_streaming_response(self):
+        def streaming_app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/csv')])
+            return (f'{number}\n'.encode() for number in range(100))
+
+        status, _, chunks = run(call(
+            WSGIThreadPoolApplication(streaming_app, threads=1), scope(),
+        ))
+        assert status == 200
+        assert b''.join(chunks) == b''.join(
+            f'{number}\n'.encode() for number in range(100)
+        ), 'Проверьте, что потоковый ответ отдаётся частями по порядку'
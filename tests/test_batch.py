@@ -0,0 +1,120 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Comment, Review, Title
+
+REVIEWS_URL = '/api/v1/batch/reviews/'
+COMMENTS_URL = '/api/v1/batch/comments/'
+
+
+@pytest.fixture
+def titles(category):
+    return [
+        Title.objects.create(name=f'Произведение {i}', year=2000,
+                             category=category)
+        for i in range(6)
+    ]
+
+
+def review_items(titles, score=5):
+    return [
+        {'title': title.id, 'text': 'Отзыв', 'score': score}
+        for title in titles
+    ]
+
+
+@pytest.mark.django_db
+class TestBatchReviews:
+
+    def test_per_item_results(self, user_client, title, another_user):
+        Review.objects.create(
+            title=title, author=another_user, text='Чужой', score=2)
+        items = [
+            {'title': title.id, 'text': 'Отлично', 'score': 10},
+            {'title': title.id, 'text': 'Ещё раз', 'score': 9},
+            {'title': title.id, 'text': 'Мимо', 'score': 11},
+            {'title': 999, 'text': 'Нет такого', 'score': 5},
+        ]
+        response = user_client.post(
+            REVIEWS_URL, {'items': items}, format='json')
+        assert response.status_code == 200
+        statuses = [item['status'] for item in response.json()['results']]
+        assert statuses == [201, 400, 400, 400], (
+            'Проверьте, что результат возвращается для каждого элемента'
+        )
+        created = response.json()['results'][0]['data']
+        assert Review.objects.get(pk=created['id']).text == 'Отлично'
+        title.refresh_from_db()
+        assert (title.reviews_count, title.score_sum) == (2, 12), (
+            'Проверьте, что счётчики произведения обновляются пачкой'
+        )
+        assert title.rating == 6
+
+    def test_queries_do_not_grow_with_batch(self, user_client, titles):
+        def queries(batch):
+            with CaptureQueriesContext(connection) as context:
+                response = user_client.post(
+                    REVIEWS_URL, {'items': batch}, format='json')
+            assert response.status_code == 200
+            return len(context.captured_queries)
+
+        small = queries(review_items(titles[:2]))
+        Review.objects.all().delete()
+        assert queries(review_items(titles)) == small, (
+            'Проверьте, что число запросов не зависит от размера пачки'
+        )
+        assert all(title.reviews_count == 1 for title in
+                   Title.objects.filter(pk__in=[t.pk for t in titles]))
+
+    def test_author_cannot_be_overridden(
+            self, admin, admin_client, another_user, title, user):
+        items = [{'title': title.id, 'text': 'Импорт', 'score': 7,
+                  'author': user.username}]
+        response = admin_client.post(
+            REVIEWS_URL, {'items': items}, format='json')
+        assert response.json()['results'][0]['status'] == 201
+        assert Review.objects.get().author == admin, (
+            'Проверьте, что пачка не позволяет писать от имени '
+            'другого пользователя'
+        )
+        another_user.role = 'moderator'
+        another_user.save()
+        moderator_client = APIClient()
+        moderator_client.force_authenticate(another_user)
+        response = moderator_client.post(COMMENTS_URL, {'items': [
+            {'review': Review.objects.get().id, 'text': 'Чужой',
+             'author': user.username},
+        ]}, format='json')
+        assert response.json()['results'][0]['status'] == 201
+        assert Comment.objects.get().author == another_user
+
+    def test_batch_limit(self, user_client, title):
+        items = review_items([title]) * 101
+        response = user_client.post(
+            REVIEWS_URL, {'items': items}, format='json')
+        assert response.status_code == 400
+
+    def test_anonymous_rejected(self, client, title):
+        response = client.post(
+            REVIEWS_URL, {'items': review_items([title])},
+            content_type='application/json')
+        assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_batch_comments(user_client, title, user):
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=5)
+    items = [
+        {'review': review.id, 'text': 'Первый'},
+        {'review': review.id, 'text': 'Второй'},
+        {'review': 999, 'text': 'Мимо'},
+    ]
+    response = user_client.post(COMMENTS_URL, {'items': items}, format='json')
+    results = response.json()['results']
+    assert [item['status'] for item in results] == [201, 201, 400]
+    assert set(Comment.objects.values_list('id', flat=True)) == {
+        results[0]['data']['id'], results[1]['data']['id'],
+    }
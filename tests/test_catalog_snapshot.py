@@ -0,0 +1,137 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.snapshot import get_snapshot
+from reviews.models import Categories, Genres, Title
+
+CATALOG_TABLES = ('FROM "reviews_genres"', 'FROM "reviews_categories"')
+SLUG_LOOKUPS = ('"reviews_genres"."slug" =', '"reviews_categories"."slug" =')
+
+
+def catalog_queries(context, markers=CATALOG_TABLES):
+    return [
+        query['sql'] for query in context.captured_queries
+        if any(marker in query['sql'] for marker in markers)
+    ]
+
+
+def warm_snapshots():
+    for model in (Genres, Categories):
+        get_snapshot(model).current()
+
+
+def age_snapshot(model, seconds=60):
+    snapshot = get_snapshot(model)
+    snapshot.maps = snapshot.maps._replace(
+        loaded=time.monotonic() - seconds)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCatalogSnapshot:
+
+    def test_titles_render_without_catalog_queries(self, client, title):
+        warm_snapshots()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/')
+            detail = client.get(
+                f'/api/v1/titles/{title.id}/?fields=genre,category')
+        assert response.status_code == 200
+        assert not catalog_queries(context), (
+            'Проверьте, что жанры и категории берутся из снимка каталога'
+        )
+        assert response.json()['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'}
+        ]
+        assert response.json()['results'][0]['category'] == {
+            'name': 'Фильм', 'slug': 'movie'
+        }
+        assert detail.json()['genre'] == ['drama']
+        assert detail.json()['category'] == 'movie'
+
+    def test_write_validates_slugs_by_snapshot(self, admin_client, title):
+        warm_snapshots()
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', {
+                'name': 'Новое', 'year': 2000,
+                'genre': ['drama'], 'category': 'movie',
+            }, format='json')
+        assert response.status_code == 201, response.json()
+        assert not catalog_queries(context, SLUG_LOOKUPS), (
+            'Проверьте, что слаги при записи проверяются по снимку каталога'
+        )
+        created = Title.objects.get(pk=response.json()['id'])
+        assert created.category.slug == 'movie'
+        assert list(created.genre.values_list('slug', flat=True)) == [
+            'drama'
+        ]
+        assert response.json()['genre'] == ['drama']
+
+    def test_unknown_slugs(self, admin_client, title):
+        for data in (
+            {'genre': ['missing']},
+            {'genre': 'drama'},
+            {'category': 'missing'},
+        ):
+            response = admin_client.patch(
+                f'/api/v1/titles/{title.id}/', data, format='json')
+            assert response.status_code == 400, (
+                f'Проверьте, что {data} отклоняется с кодом 400'
+            )
+            assert set(response.json()) == set(data)
+
+    def test_new_entries_are_seen(self, admin_client, client, title):
+        warm_snapshots()
+        response = admin_client.post(
+            '/api/v1/genres/', {'name': 'Комедия', 'slug': 'comedy'},
+            format='json')
+        assert response.status_code == 201
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/', {'genre': ['comedy', 'drama']},
+            format='json')
+        assert response.status_code == 200, (
+            'Проверьте, что новый жанр сразу доступен для записи'
+        )
+        # Мимо API: версия не сдвигается, снимок дочитывается на промахе.
+        Categories.objects.create(name='Книга', slug='book')
+        age_snapshot(Categories, seconds=2)
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/', {'category': 'book'},
+            format='json')
+        assert response.status_code == 200
+        genre = Genres.objects.get(slug='drama')
+        genre.name = 'Трагедия'
+        genre.save()
+        assert client.get(f'/api/v1/titles/{title.id}/').json()['genre'] == [
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Трагедия', 'slug': 'drama'},
+        ], 'Проверьте, что изменения жанров видны после сдвига версии'
+
+    def test_filters_and_top_use_snapshot(self, client, title):
+        warm_snapshots()
+        with CaptureQueriesContext(connection) as context:
+            by_genre = client.get('/api/v1/titles/?genre=drama')
+            by_category = client.get('/api/v1/titles/?category=movie')
+        assert not catalog_queries(context)
+        assert by_genre.json()['count'] == by_category.json()['count'] == 1
+        assert client.get(
+            '/api/v1/titles/?genre=missing').json()['count'] == 0
+        assert client.get(
+            '/api/v1/titles/top/?genre=missing').status_code == 404
+        assert client.get(
+            '/api/v1/titles/top/?category=movie').status_code == 200
+
+    def test_unknown_slugs_reload_rarely(self, client, title):
+        warm_snapshots()
+        age_snapshot(Genres, seconds=2)
+        with CaptureQueriesContext(connection) as context:
+            for number in range(5):
+                response = client.get(f'/api/v1/titles/?genre=junk{number}')
+                assert response.json()['count'] == 0
+        reloads = catalog_queries(context, ('FROM "reviews_genres"',))
+        assert len(reloads) == 1, (
+            'Проверьте, что промахи по слагам перечитывают снимок '
+            'не чаще раза в секунду'
+        )
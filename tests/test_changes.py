@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from reviews.changes import sequence_changes
+from reviews.models import Change, Genres, Review
+
+URL = '/api/v1/changes/'
+
+
+def feed(client, since=0, **params):
+    response = client.get(URL, {'since': since, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db
+class TestChanges:
+
+    def test_only_admin(self, client, user_client):
+        assert client.get(URL).status_code == 401
+        assert user_client.get(URL).status_code == 403
+
+    def test_inserts_updates_and_tombstones(
+            self, admin_client, title, user):
+        since = feed(admin_client)['next']
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5)
+        title.refresh_from_db()
+        title.name = 'Новое название'
+        title.save()
+        genre = Genres.objects.create(name='Комедия', slug='comedy')
+        title.genre.add(genre)
+        review.delete()
+        changes = feed(admin_client, since)['results']
+        assert [
+            (change['table'], change['action']) for change in changes
+        ] == [
+            ('review', 'create'),
+            ('titles', 'update'),
+            ('genre', 'create'),
+            ('genre_title', 'create'),
+            ('review', 'delete'),
+        ], 'Проверьте, что журнал отдаёт изменения по порядку'
+        seqs = [change['seq'] for change in changes]
+        assert seqs == sorted(seqs) and seqs[0] > since
+        assert changes[0]['data'] is None, (
+            'Проверьте, что у удалённого объекта нет данных'
+        )
+        assert changes[1]['data']['name'] == 'Новое название'
+        assert changes[3]['data'] == {
+            'id': changes[3]['id'],
+            'title_id': title.id,
+            'genre_id': genre.id,
+        }
+
+    def test_cascade_and_genre_removal(
+            self, admin_client, title, user):
+        genre = title.genre.get()
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5)
+        since = feed(admin_client)['next']
+        title_id = title.id
+        title.genre.remove(genre)
+        title.delete()
+        tombstones = {
+            (change['table'], change['id'])
+            for change in feed(admin_client, since)['results']
+            if change['action'] == 'delete'
+        }
+        assert {
+            ('titles', title_id), ('review', review.id)
+        } <= tombstones, (
+            'Проверьте, что каскадные удаления попадают в журнал'
+        )
+        assert len([t for t in tombstones if t[0] == 'genre_title']) == 1
+
+    def test_category_removal_updates_titles(
+            self, admin_client, title, category):
+        since = feed(admin_client)['next']
+        category_id = category.id
+        category.delete()
+        changes = feed(admin_client, since)['results']
+        assert [
+            (change['table'], change['id'], change['action'])
+            for change in changes
+        ] == [
+            ('titles', title.id, 'update'),
+            ('category', category_id, 'delete'),
+        ], (
+            'Проверьте, что обнуление категории у произведений попадает '
+            'в журнал'
+        )
+        assert changes[0]['data']['category'] is None
+
+    def test_paging(self, admin_client):
+        for number in range(5):
+            Genres.objects.create(name=f'Жанр {number}', slug=f'g{number}')
+        sequence_changes()
+        since = Change.objects.filter(table='genre').first().seq - 1
+        page = feed(admin_client, since, limit=3)
+        assert len(page['results']) == 3
+        rest = feed(admin_client, page['next'], limit=3)
+        assert [
+            change['id'] for change in page['results'] + rest['results']
+            if change['table'] == 'genre'
+        ] == list(
+            Genres.objects.order_by('id').values_list('id', flat=True)
+        ), 'Проверьте, что next продолжает журнал без пропусков'
+        assert feed(admin_client, rest['next'])['results'] == []
+        assert admin_client.get(URL, {'since': -1}).status_code == 400
+
+    def test_late_commit_is_not_skipped(self, admin_client):
+        early = Genres.objects.create(name='Ранний', slug='early')
+        Genres.objects.create(name='Поздний', slug='late')
+        # Транзакция с первой записью ещё открыта: её строки не видно.
+        pending = Change.objects.get(table='genre', object_id=early.id)
+        pending.delete()
+        page = feed(admin_client)
+        assert ('genre', early.id) not in {
+            (change['table'], change['id']) for change in page['results']
+        }
+        # Коммит — дольше любого окна ожидания после вставки.
+        pending.created = timezone.now() - timedelta(minutes=5)
+        pending.save()
+        late = feed(admin_client, page['next'])['results']
+        assert [(change['table'], change['id']) for change in late] == [
+            ('genre', early.id)
+        ], (
+            'Проверьте, что запись долгой транзакции отдаётся после '
+            'уже прочитанных, а не пропускается'
+        )
+        assert late[0]['seq'] > page['next']
+
+    def test_untracked_fields_are_skipped(self, user):
+        count = Change.objects.count()
+        user.last_login = user.date_joined
+        user.save(update_fields=['last_login'])
+        assert Change.objects.count() == count
+        user.save(update_fields=['bio'])
+        assert Change.objects.count() == count + 1
+
+    def test_batch_is_logged(self, user_client, title):
+        response = user_client.post('/api/v1/batch/reviews/', {'items': [
+            {'title': title.id, 'text': 'Отзыв', 'score': 5},
+        ]}, format='json')
+        assert response.status_code == 200
+        review = Review.objects.get()
+        assert Change.objects.filter(
+            table='review', object_id=review.id, action='create',
+        ).count() == 1, 'Проверьте, что пачка отзывов попадает в журнал'
@@ -0,0 +1,128 @@
+import time
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import conditional
+from api.cache import MODIFIED_KEY
+from reviews.models import Comment, Review
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    def urls(self, title, review):
+        base = f'/api/v1/titles/{title.id}'
+        return [
+            '/api/v1/titles/',
+            f'{base}/',
+            f'{base}/reviews/',
+            f'{base}/reviews/{review.id}/',
+            f'{base}/reviews/{review.id}/comments/',
+        ]
+
+    def test_not_modified(self, client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=5)
+        Comment.objects.create(review=review, author=user, text='b')
+        for url in self.urls(title, review):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.has_header('ETag'), (
+                f'Проверьте, что {url} отдаёт ETag'
+            )
+            assert response.has_header('Last-Modified')
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+            assert response.status_code == 304, (
+                f'Проверьте, что {url} отвечает 304 на совпавший ETag'
+            )
+            # Допустима только проверка существования родителя списка.
+            assert all(
+                query['sql'].startswith('SELECT (1) AS "a"')
+                for query in context.captured_queries
+            ), 'Проверьте, что 304 отдаётся без выборки страницы'
+
+    def test_etag_changes_on_update(self, client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=5)
+        urls = self.urls(title, review)
+        etags = {url: client.get(url)['ETag'] for url in urls}
+        review.text = 'исправленный отзыв'
+        review.save()
+        for url in urls[2:4]:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == 200, (
+                f'Проверьте, что изменение отзыва меняет ETag {url}'
+            )
+        title.genre.clear()
+        response = client.get(urls[1], HTTP_IF_NONE_MATCH=etags[urls[1]])
+        assert response.status_code == 200
+
+    def test_if_modified_since(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        response = client.get(
+            f'/api/v1/titles/{title.id}/',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        assert response.status_code == 304
+
+    def test_delete_changes_validators(
+            self, client, title, user, another_user):
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=5)
+        other = Review.objects.create(
+            title=title, author=another_user, text='b', score=6)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        # Отметка в прошлом: Last-Modified считается с точностью до секунды.
+        cache.set(MODIFIED_KEY.format('reviews.review'), time.time() - 60)
+        response = client.get(url)
+        other.delete()
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 200, (
+            'Проверьте, что удаление отзыва меняет Last-Modified'
+        )
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == 200, 'Проверьте, что удаление отзыва меняет ETag'
+        assert client.get(f'{url}{review.id}/').status_code == 200
+
+    @pytest.mark.parametrize('command, options', [
+        ('rebuild_ratings', {}),
+        ('generate_data', {
+            'users': 5, 'titles': 5, 'reviews': 10, 'comments': 5,
+            'genres': 2, 'categories': 2,
+        }),
+    ])
+    def test_bulk_commands_change_validators(
+            self, client, title, command, options):
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+        call_command(command, stdout=StringIO(), **options)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Проверьте, что {command} в обход сигналов меняет ETag'
+        )
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 1 + options.get('titles', 0)
+
+    def test_validators_expire(self, client, title, monkeypatch, settings):
+        url = f'/api/v1/titles/{title.id}/'
+        response = client.get(url)
+        now = time.time() + settings.CATALOG_CACHE_TIMEOUT
+        monkeypatch.setattr(conditional.time, 'time', lambda: now)
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == 200, (
+            'Проверьте, что ETag без сдвига версий живёт не дольше '
+            'CATALOG_CACHE_TIMEOUT'
+        )
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 200
@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import OutgoingMail
+
+SIGNUP = {'username': 'reader', 'email': 'reader@example.com'}
+
+
+def signup_code(client):
+    client.post('/api/v1/auth/signup/', SIGNUP)
+    body = OutgoingMail.objects.latest('id').body
+    return body.rsplit(' ', 1)[-1]
+
+
+def request_token(client, code):
+    return client.post(
+        '/api/v1/auth/token/',
+        {'username': SIGNUP['username'], 'confirmation_code': code},
+    )
+
+
+def writes(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].split(' ', 1)[0] in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+
+@pytest.mark.django_db
+class TestConfirmationCodes:
+
+    def test_code_is_single_use(self, client):
+        code = signup_code(client)
+        response = request_token(client, code)
+        assert response.status_code == 200
+        assert 'token' in response.json()
+        assert request_token(client, code).status_code == 400, (
+            'Проверьте, что код подтверждения нельзя использовать дважды'
+        )
+
+    def test_wrong_code_does_not_write(self, client):
+        code = signup_code(client)
+        with CaptureQueriesContext(connection) as context:
+            for wrong in ('0', 'abc-def', code[:-1] + 'x'):
+                assert request_token(client, wrong).status_code == 400
+        assert writes(context) == [], (
+            'Проверьте, что неверный код не приводит к записи в БД'
+        )
+        assert request_token(client, code).status_code == 200
+
+    def test_expired_code(self, client, settings):
+        code = signup_code(client)
+        settings.CONFIRMATION_CODE_TIMEOUT = -1
+        assert request_token(client, code).status_code == 400, (
+            'Проверьте, что просроченный код отклоняется'
+        )
+
+    def test_repeated_signup_does_not_touch_user(self, client):
+        signup_code(client)
+        with CaptureQueriesContext(connection) as context:
+            client.post('/api/v1/auth/signup/', SIGNUP)
+        assert not any('reviews_user' in sql for sql in writes(context)), (
+            'Проверьте, что повторная регистрация не пишет в таблицу '
+            'пользователей'
+        )
+
+    def test_malformed_codes(self, client):
+        signup_code(client)
+        for code in (12345, ['a-b'], '', 'abc', '-', 'zz-', '!!-abc', 'a-b-c'):
+            response = client.post(
+                '/api/v1/auth/token/',
+                {'username': SIGNUP['username'], 'confirmation_code': code},
+                content_type='application/json',
+            )
+            assert response.status_code == 400, (
+                f'Проверьте, что код {code!r} отклоняется с кодом 400'
+            )
@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def reviews(title, django_user_model):
+    for i in range(12):
+        author = django_user_model.objects.create_user(
+            username=f'reader{i}', email=f'reader{i}@yamdb.fake')
+        Review.objects.create(
+            title=title, author=author, text=f'Отзыв {i}', score=5)
+    return title.reviews.order_by('-pub_date', 'id')
+
+
+def walk(client, url):
+    ids = []
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что курсорная пагинация не считает COUNT(*)'
+        data = response.json()
+        assert 'count' not in data
+        ids.extend(item['id'] for item in data['results'])
+        url = data['next']
+    return ids
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_reviews_cursor_walks_all_pages(self, client, title, reviews):
+        ids = walk(
+            client, f'/api/v1/titles/{title.id}/reviews/?pagination=cursor')
+        assert ids == [review.id for review in reviews], (
+            'Проверьте, что курсор обходит отзывы по (-pub_date, id) '
+            'без пропусков и повторов'
+        )
+
+    def test_titles_cursor(self, client, category):
+        for name in ('Б', 'А', 'В', 'А'):
+            Title.objects.create(name=name, year=2000, category=category)
+        ids = walk(client, '/api/v1/titles/?pagination=cursor')
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True))
+        assert ids == expected
+
+    def test_default_pagination_unchanged(self, client, title, reviews):
+        data = client.get(f'/api/v1/titles/{title.id}/reviews/').json()
+        assert data['count'] == 12
+        assert len(data['results']) == 5
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connections
+
+from api_yamdb.db.pool import ConnectionPool, get_pool
+from api_yamdb.db.sqlite3.base import DatabaseWrapper
+
+
+class Raw:
+    """Сырое подключение: только то, что пулу нужно от драйвера."""
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+
+    def test_reuses_and_checks_connections(self):
+        pool = ConnectionPool('test', size=2, timeout=1,
+                              health_check_interval=0)
+        first = pool.acquire(Raw, lambda raw: not raw.closed)
+        pool.release(first)
+        assert pool.acquire(Raw, lambda raw: not raw.closed) is first, (
+            'Проверьте, что пул отдаёт возвращённое подключение повторно'
+        )
+        pool.release(first)
+        first.closed = True
+        second = pool.acquire(Raw, lambda raw: not raw.closed)
+        assert second is not first
+        assert pool.metrics()['opened'] == 2
+        assert pool.metrics()['health_check_failures'] == 1, (
+            'Проверьте, что мёртвое подключение из пула заменяется новым'
+        )
+
+    def test_waits_for_free_connection(self):
+        pool = ConnectionPool('test', size=2, timeout=2)
+        held = [pool.acquire(Raw, None) for _ in range(2)]
+        threading.Timer(0.05, pool.release, args=(held[0],)).start()
+        assert pool.acquire(Raw, None) is held[0]
+        metrics = pool.metrics()
+        assert (metrics['opened'], metrics['waits'], metrics['in_use']) == (
+            2, 1, 2
+        ), 'Проверьте, что при исчерпании пула запрос ждёт подключение'
+        assert metrics['wait_seconds'] > 0
+
+    def test_timeout(self):
+        pool = ConnectionPool('test', size=1, timeout=0.05)
+        pool.acquire(Raw, None)
+        started = time.monotonic()
+        with pytest.raises(OperationalError):
+            pool.acquire(Raw, None)
+        assert time.monotonic() - started < 1
+        assert pool.metrics()['timeouts'] == 1
+
+    def test_bounded_under_threads(self):
+        pool = ConnectionPool('test', size=3, timeout=5)
+        peak = []
+
+        def work():
+            raw = pool.acquire(Raw, None)
+            peak.append(pool.metrics()['in_use'])
+            time.sleep(0.01)
+            pool.release(raw)
+
+        threads = [threading.Thread(target=work) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max(peak) <= 3 and pool.metrics()['opened'] <= 3, (
+            'Проверьте, что пул не открывает больше POOL_SIZE подключений'
+        )
+
+
+@pytest.mark.django_db
+class TestPooledBackend:
+
+    def test_close_returns_connection_to_pool(self, tmp_path):
+        settings_dict = {
+            **connections['default'].settings_dict,
+            'ENGINE': 'api_yamdb.db.sqlite3',
+            'NAME': str(tmp_path / 'pool.sqlite3'),
+            'POOL_SIZE': 1,
+            'POOL_TIMEOUT': 0.05,
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias='pool_test')
+        other = DatabaseWrapper(settings_dict, alias='pool_test')
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        with pytest.raises(OperationalError):
+            other.ensure_connection()
+        wrapper.close()
+        other.ensure_connection()
+        assert other.connection is raw, (
+            'Проверьте, что close() возвращает подключение в пул'
+        )
+        with other.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            assert cursor.fetchone() == (1,)
+        other.close()
+        metrics = get_pool('pool_test', settings_dict).metrics()
+        assert (metrics['opened'], metrics['idle']) == (1, 1)
+
+    def test_metrics(self, admin_client):
+        response = admin_client.get('/api/v1/metrics/')
+        assert 'yamdb_db_connections_total' in response.content.decode()
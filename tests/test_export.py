@@ -0,0 +1,55 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title, User)
+
+
+def quiet():
+    return io.StringIO()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_round_trip_through_importcsv(self, tmp_path):
+        call_command('importcsv', stdout=quiet())
+        reviews = list(Review.objects.values_list('id', 'pub_date', 'score'))
+        call_command('exportcsv', str(tmp_path), stdout=quiet())
+        assert (tmp_path / 'review.csv').exists()
+
+        for model in (Comment, Review, GenreTitle, Title, Genres,
+                      Categories, User):
+            model.objects.all().delete()
+        call_command('importcsv', path=str(tmp_path), stdout=quiet())
+        assert list(
+            Review.objects.values_list('id', 'pub_date', 'score')
+        ) == reviews, 'Проверьте, что выгрузка загружается обратно без потерь'
+        assert Title.objects.count() == 32
+
+    def test_api_streams_csv_and_ndjson(self, admin_client, title):
+        response = admin_client.get('/api/v1/export/titles.csv')
+        assert response.status_code == 200
+        assert response.streaming, 'Проверьте, что выгрузка потоковая'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == 'id,name,year,category'
+        assert lines[1] == f'{title.id},{title.name},1994,{title.category_id}'
+
+        response = admin_client.get('/api/v1/export/titles.ndjson')
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert rows == [{
+            'id': title.id, 'name': title.name,
+            'year': 1994, 'category': title.category_id,
+        }]
+
+    def test_api_is_admin_only(self, client, user_client, admin_client):
+        assert client.get('/api/v1/export/titles.csv').status_code == 401
+        assert user_client.get('/api/v1/export/titles.csv').status_code == 403
+        assert admin_client.get(
+            '/api/v1/export/secrets.csv').status_code == 404
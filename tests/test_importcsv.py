@@ -0,0 +1,51 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title, User
+from reviews.search import INDEX_VERSION_KEY, index_cache
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    def test_import_static_data(self):
+        out = io.StringIO()
+        call_command('importcsv', batch_size=10, stdout=out)
+        assert 'строк/с' in out.getvalue(), (
+            'Проверьте, что команда importcsv сообщает скорость загрузки'
+        )
+        assert User.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что importcsv сохраняет pub_date из файла'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert title.reviews_count == title.reviews.count(), (
+            'Проверьте, что после загрузки пересчитан рейтинг произведений'
+        )
+        created = Title.objects.create(name='Новое', year=2000)
+        assert created.pk > 32
+
+    @pytest.mark.django_db(transaction=True)
+    def test_import_refreshes_caches(self, client):
+        url = '/api/v1/titles/'
+        assert client.get(url).json()['count'] == 0
+        assert client.get(url, {'search': 'Шоушенка'}).json()['count'] == 0
+        version = index_cache().get(INDEX_VERSION_KEY)
+        call_command('importcsv', stdout=io.StringIO())
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что importcsv сбрасывает кэш ответов каталога'
+        )
+        assert response.json()['count'] == 32
+        assert index_cache().get(INDEX_VERSION_KEY) != version
+        found = client.get(url, {'search': 'Шоушенка'}).json()
+        assert [title['name'] for title in found['results']] == [
+            'Побег из Шоушенка'
+        ], 'Проверьте, что поиск видит загруженные произведения'
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.leaderboards import refresh_leaderboards
+from reviews.models import Categories, Review, Title, TitleRanking
+
+TOP_URL = '/api/v1/titles/top/'
+TRENDING_URL = '/api/v1/titles/trending/'
+
+
+@pytest.fixture
+def rated_titles(title, genre, user, another_user):
+    """Оценки: title — 9, second — 7, third — 5 (в другой категории)."""
+    other = Categories.objects.create(name='Книги', slug='books')
+    second = Title.objects.create(name='Второе', year=2000,
+                                  category=title.category)
+    second.genre.add(genre)
+    third = Title.objects.create(name='Третье', year=2000, category=other)
+    for rated, score in ((title, 9), (second, 7), (third, 5)):
+        for author in (user, another_user):
+            Review.objects.create(
+                title=rated, author=author, text='Отзыв', score=score)
+    return title, second, third
+
+
+def names(response):
+    return [entry['title']['name'] for entry in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_top_rated(self, client, rated_titles):
+        title, second, third = rated_titles
+        refresh_leaderboards(min_reviews=2)
+        response = client.get(TOP_URL)
+        assert response.status_code == 200
+        assert names(response) == [title.name, second.name, third.name], (
+            'Проверьте, что /titles/top/ сортирует произведения по рейтингу'
+        )
+        assert response.json()['results'][0]['position'] == 1
+        assert names(client.get(TOP_URL, {'category': 'books'})) == [
+            third.name
+        ], 'Проверьте, что ?category= отдаёт рейтинг внутри категории'
+        assert names(client.get(TOP_URL, {'genre': 'drama'})) == [
+            title.name, second.name
+        ]
+        assert client.get(TOP_URL, {'genre': 'nope'}).status_code == 404
+
+    def test_min_reviews_and_size(self, client, rated_titles, admin):
+        title, second, _ = rated_titles
+        Review.objects.create(title=second, author=admin, text='a', score=7)
+        refresh_leaderboards(size=1, min_reviews=3)
+        assert names(client.get(TOP_URL)) == [second.name], (
+            'Проверьте, что в топ попадают только произведения '
+            'с достаточным числом отзывов'
+        )
+        assert TitleRanking.objects.count() == 4
+
+    def test_trending(self, client, rated_titles, admin):
+        title, second, third = rated_titles
+        Review.objects.filter(title=title).update(
+            pub_date=timezone.now() - timedelta(days=30))
+        Review.objects.create(title=third, author=admin, text='a', score=1)
+        refresh_leaderboards(trending_days=7)
+        response = client.get(TRENDING_URL)
+        assert names(response) == [third.name, second.name], (
+            'Проверьте, что trending считает только свежие отзывы'
+        )
+        assert response.json()['results'][0]['score'] == pytest.approx(3 / 7)
+
+    def test_pages_read_by_position(self, client, rated_titles):
+        refresh_leaderboards(min_reviews=1)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(TOP_URL, {'page_size': 2})
+        first_page = response.json()
+        assert len(first_page['results']) == 2
+        assert first_page['next'] is not None
+        assert first_page['previous'] is None
+        assert not any(
+            'COUNT(' in query['sql'] or 'OFFSET' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что страница рейтинга читается по диапазону мест'
+        second_page = client.get(first_page['next']).json()
+        assert [entry['position'] for entry in second_page['results']] == [3]
+        assert second_page['next'] is None
+        assert client.get(TOP_URL, {'page': 5}).status_code == 404
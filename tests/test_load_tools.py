@@ -0,0 +1,81 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.benchmark import compare, percentile
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.mark.django_db
+class TestLoadTools:
+
+    def test_generate_data(self):
+        call_command(
+            'generate_data', users=30, titles=40, reviews=300, comments=50,
+            genres=5, categories=3, batch_size=64, stdout=io.StringIO(),
+        )
+        assert (User.objects.count(), Title.objects.count(),
+                Review.objects.count(), Comment.objects.count()) == (
+            30, 40, 300, 50)
+        counts = sorted(
+            Title.objects.values_list('reviews_count', flat=True),
+            reverse=True,
+        )
+        assert counts[0] >= 5 * counts[len(counts) // 2], (
+            'Проверьте, что популярность произведений неравномерна'
+        )
+        title = Title.objects.order_by('-reviews_count').first()
+        assert title.reviews_count == title.reviews.count(), (
+            'Проверьте, что после генерации пересчитаны рейтинги'
+        )
+
+        call_command('generate_data', users=5, titles=5, reviews=10,
+                     comments=5, stdout=io.StringIO())
+        assert Title.objects.count() == 45, (
+            'Проверьте, что повторный запуск дописывает данные'
+        )
+
+    def test_benchmark_writes_baseline(self, tmp_path):
+        call_command('generate_data', users=10, titles=10, reviews=40,
+                     comments=20, stdout=io.StringIO())
+        output = tmp_path / 'baseline.json'
+        with pytest.raises(CommandError):
+            call_command('benchmark', iterations=1, warmup=0,
+                         stdout=io.StringIO())
+        users = User.objects.count()
+        call_command('benchmark', iterations=2, warmup=0, writes=True,
+                     allow_non_debug=True, output=str(output),
+                     stdout=io.StringIO())
+        assert User.objects.count() == users, (
+            'Проверьте, что бенчмарк удаляет созданных им пользователей'
+        )
+        result = json.loads(output.read_text(encoding='UTF-8'))
+        assert {'titles-list', 'comments-detail', 'users-me', 'signup',
+                'comments-batch'} <= set(result['routes'])
+        route = result['routes']['titles-list']
+        assert route['statuses'] == [200]
+        assert route['p50_ms'] <= route['p95_ms'] <= route['p99_ms']
+        assert route['queries'] >= 0
+
+        call_command('benchmark', iterations=2, warmup=0,
+                     route=['genres-list'], baseline=str(output),
+                     allow_non_debug=True,
+                     min_delta_ms=1000, stdout=io.StringIO())
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert [percentile(values, rank) for rank in (50, 95, 99)] == [50, 95, 99]
+
+
+def test_compare_reports_regressions():
+    baseline = {'routes': {'titles-list': {
+        'p95_ms': 10, 'p99_ms': 12, 'queries': 3}}}
+    current = {'routes': {'titles-list': {
+        'p95_ms': 20, 'p99_ms': 12.5, 'queries': 4}}}
+    regressions = compare(baseline, current, tolerance=0.2, min_delta_ms=2)
+    assert len(regressions) == 2, (
+        'Проверьте, что сравнение ловит рост p95 и числа SQL-запросов'
+    )
@@ -0,0 +1,67 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import OutgoingMail
+from reviews.outbox import deliver_batch, enqueue_mail
+
+
+def enqueue(count):
+    for number in range(count):
+        enqueue_mail(
+            'Тема', f'Письмо {number}', 'yamdb@example.com',
+            [f'user{number}@example.com'],
+        )
+
+
+@pytest.mark.django_db
+class TestMailOutbox:
+
+    def test_signup_only_enqueues(self, client, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        settings.EMAIL_HOST, settings.EMAIL_PORT = '127.0.0.1', 9
+        response = client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'reader', 'email': 'reader@example.com'},
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что регистрация не зависит от почтового сервера'
+        )
+        assert mail.outbox == []
+        queued = OutgoingMail.objects.get()
+        assert queued.to == 'reader@example.com'
+        assert queued.status == OutgoingMail.PENDING
+
+    def test_worker_sends_batch_over_one_connection(self, smtp_server):
+        enqueue(3)
+        call_command('run_mail_worker', '--once', '--batch-size', '10')
+        assert len(smtp_server.messages) == 3
+        assert smtp_server.connections == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        assert not OutgoingMail.objects.exclude(
+            status=OutgoingMail.SENT).exists()
+
+    def test_failed_delivery_is_retried_with_backoff(self, smtp_server,
+                                                     settings):
+        settings.MAIL_RETRY_DELAY = 60
+        settings.MAIL_MAX_ATTEMPTS = 2
+        smtp_server.reject = True
+        enqueue(1)
+        assert deliver_batch(10) == (0, 1)
+        queued = OutgoingMail.objects.get()
+        assert queued.status == OutgoingMail.PENDING
+        assert queued.attempts == 1
+        assert queued.next_attempt > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+        assert deliver_batch(10) == (0, 0)
+
+        OutgoingMail.objects.update(next_attempt=timezone.now())
+        deliver_batch(10)
+        queued.refresh_from_db()
+        assert queued.status == OutgoingMail.FAILED, (
+            'Проверьте, что после MAIL_MAX_ATTEMPTS письмо помечается '
+            'неотправленным'
+        )
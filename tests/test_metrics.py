@@ -0,0 +1,57 @@
+import logging
+
+import pytest
+
+from api.metrics import registry, worker_label
+
+
+@pytest.fixture
+def metrics():
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+
+    def test_routes_are_exposed(self, client, admin_client, title, metrics):
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.id}/')
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        labels = (
+            'route="api:titles-list",method="GET",status="200",'
+            f'worker="{worker_label()}"'
+        )
+        assert f'yamdb_request_duration_seconds_count{{{labels}}} 1' in body, (
+            'Проверьте, что латентность учитывается по имени маршрута'
+        )
+        assert 'route="api:titles-detail"' in body
+        queries = [
+            line for line in body.splitlines()
+            if line.startswith(f'yamdb_request_db_queries_sum{{{labels}}}')
+        ]
+        assert queries and int(queries[0].split()[-1]) > 0, (
+            'Проверьте, что учитывается число SQL-запросов'
+        )
+        assert f'yamdb_response_size_bytes_total{{{labels}}}' in body
+        assert 'yamdb_catalog_cache_requests_total{result="miss"}' in body
+
+    def test_only_admin(self, client, user_client, metrics):
+        assert client.get('/api/v1/metrics/').status_code == 401
+        assert user_client.get('/api/v1/metrics/').status_code == 403
+
+    def test_slow_request_is_logged(self, client, title, settings, caplog,
+                                    metrics):
+        settings.METRICS_SLOW_REQUEST_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.metrics'):
+            client.get('/api/v1/titles/')
+        assert len(caplog.records) == 1, (
+            'Проверьте, что медленный запрос попадает в лог'
+        )
+        assert 'reviews_title' in caplog.records[0].getMessage(), (
+            'Проверьте, что в лог медленного запроса попадает его SQL'
+        )
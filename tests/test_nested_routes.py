@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+def parent_selects(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and f'FROM "{table}"' in
+        query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    def test_write_loads_parent_once(self, user_client, title):
+        base = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                base, {'text': 'Отзыв', 'score': 5}, format='json')
+        assert response.status_code == 201
+        assert len(parent_selects(context, 'reviews_title')) == 1, (
+            'Проверьте, что при создании отзыва произведение '
+            'загружается один раз'
+        )
+        review_id = response.json()['id']
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'{base}{review_id}/comments/', {'text': 'Ок'}, format='json')
+        assert response.status_code == 201
+        assert len(parent_selects(context, 'reviews_review')) == 1, (
+            'Проверьте, что при создании комментария отзыв '
+            'загружается один раз'
+        )
+        comment_id = response.json()['id']
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(
+                f'{base}{review_id}/', {'score': 7}, format='json')
+        assert response.status_code == 200
+        assert not parent_selects(context, 'reviews_title'), (
+            'Проверьте, что при изменении отзыва произведение '
+            'не загружается отдельным запросом'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(
+                f'{base}{review_id}/comments/{comment_id}/', {'text': 'Да'},
+                format='json')
+        assert response.status_code == 200
+        assert not parent_selects(context, 'reviews_review')
+
+    def test_detail_checks_parent_in_same_query(self, client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5)
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(url).status_code == 200
+        assert not parent_selects(context, 'reviews_title')
+        other = Title.objects.create(
+            name='Другое', year=2000, category=title.category)
+        assert client.get(
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/'
+        ).status_code == 404, (
+            'Проверьте, что отзыв чужого произведения не находится'
+        )
+
+    def test_missing_parent(self, client, user_client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5)
+        other = Title.objects.create(
+            name='Другое', year=2000, category=title.category)
+        urls = [
+            '/api/v1/titles/0/reviews/',
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/',
+        ]
+        for url in urls:
+            assert client.get(url).status_code == 404, (
+                f'Проверьте, что {url} отвечает 404'
+            )
+            response = user_client.post(url, {'text': 'Ок', 'score': 5},
+                                        format='json')
+            assert response.status_code == 404
+        assert Review.objects.count() == 1 and not Comment.objects.exists()
+        response = client.get(f'/api/v1/titles/{other.id}/reviews/')
+        assert response.status_code == 200 and response.json()['count'] == 0
+
+    def test_missing_parent_is_not_cached(self, client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        title.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404, (
+            'Проверьте, что удалённое произведение не отвечает 304'
+        )
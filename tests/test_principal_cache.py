@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.authentication import principals
+
+
+@pytest.fixture(autouse=True)
+def clear_principals():
+    principals.clear()
+    yield
+    principals.clear()
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}'
+    )
+    return client
+
+
+@pytest.mark.django_db
+class TestPrincipalCache:
+
+    def test_warm_cache_costs_no_queries(self, admin, genre):
+        client = jwt_client(admin)
+        assert client.get('/api/v1/genres/').status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/genres/')
+        assert response.status_code == 200
+        assert response['X-Cache'] == 'HIT'
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что аутентификация и проверка прав не обращаются '
+            'к БД при тёплом кэше пользователей'
+        )
+
+    def test_role_change_is_visible_at_once(self, user):
+        client = jwt_client(user)
+        data = {'name': 'Комедия', 'slug': 'comedy'}
+        assert client.post('/api/v1/genres/', data).status_code == 403
+        user.role = user.ADMIN
+        user.save()
+        assert client.post('/api/v1/genres/', data).status_code == 201, (
+            'Проверьте, что сохранение пользователя сбрасывает его кэш'
+        )
+
+    def test_inactive_user_is_rejected(self, user):
+        client = jwt_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_me_update_keeps_other_fields(self, user):
+        user.bio = 'Читатель'
+        user.save()
+        client = jwt_client(user)
+        response = client.patch('/api/v1/users/me/', {'first_name': 'Иван'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert (user.bio, user.first_name) == ('Читатель', 'Иван')
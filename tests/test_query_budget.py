@@ -0,0 +1,100 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.snapshot import get_snapshot
+from reviews.models import Categories, Comment, Genres, Review, Title
+
+# Предельное число запросов к БД на один ответ эндпоинта.
+QUERY_BUDGET = {
+    'titles-list': 3,
+    'titles-detail': 2,
+    'reviews-list': 3,
+    'reviews-detail': 2,
+    'comments-list': 3,
+    'comments-detail': 2,
+    'genres-list': 2,
+    'categories-list': 2,
+}
+
+
+def count_queries(client, url):
+    cache.clear()
+    # Снимок каталога грузится раз на процесс, а не на каждый ответ.
+    for model in (Genres, Categories):
+        get_snapshot(model).current()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, f'{url} вернул {response.status_code}'
+    return len(context.captured_queries)
+
+
+def seed(title, category, users, start, stop):
+    genres = [
+        Genres.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(start, stop)
+    ]
+    for i in range(start, stop):
+        other = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=category)
+        other.genre.set(genres)
+    title.genre.add(*genres)
+    for number, author in enumerate(users[start:stop]):
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=number % 10 + 1)
+        for commenter in users:
+            Comment.objects.create(
+                review=review, author=commenter, text='Комментарий')
+
+
+@pytest.fixture
+def users(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(5)
+    ]
+
+
+def endpoints(title):
+    review = title.reviews.first()
+    comment = review.comments.first()
+    base = f'/api/v1/titles/{title.id}'
+    return {
+        'titles-list': '/api/v1/titles/',
+        'titles-detail': f'{base}/',
+        'reviews-list': f'{base}/reviews/',
+        'reviews-detail': f'{base}/reviews/{review.id}/',
+        'comments-list': f'{base}/reviews/{review.id}/comments/',
+        'comments-detail': (
+            f'{base}/reviews/{review.id}/comments/{comment.id}/'),
+        'genres-list': '/api/v1/genres/',
+        'categories-list': '/api/v1/categories/',
+    }
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    def measure(self, client, title):
+        return {
+            name: count_queries(client, url)
+            for name, url in endpoints(title).items()
+        }
+
+    def test_queries_do_not_grow_with_data(
+            self, client, title, category, users):
+        seed(title, category, users, 0, 1)
+        small = self.measure(client, title)
+        seed(title, category, users, 1, 5)
+        large = self.measure(client, title)
+        for name, queries in large.items():
+            assert queries == small[name], (
+                f'Число запросов {name} растёт вместе с данными: '
+                f'{small[name]} -> {queries}'
+            )
+            assert queries <= QUERY_BUDGET[name], (
+                f'{name} делает {queries} запросов при бюджете '
+                f'{QUERY_BUDGET[name]}'
+            )
@@ -0,0 +1,117 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Categories, Comment, Genres, GenreTitle, Review, Title
+
+TITLES = 2000
+USERS = 40
+REVIEWED_TITLES = 200
+
+# Таблицы, полный просмотр которых считается регрессией.
+LARGE_TABLES = (
+    'reviews_title', 'reviews_review', 'reviews_comment',
+    'reviews_genretitle',
+)
+
+
+@pytest.fixture
+def large_dataset(django_user_model):
+    Categories.objects.bulk_create(
+        Categories(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(20)
+    )
+    Genres.objects.bulk_create(
+        Genres(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(30)
+    )
+    categories = list(Categories.objects.order_by('pk'))
+    genres = list(Genres.objects.order_by('pk'))
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i}', year=1900 + i % 120,
+            category=categories[i % len(categories)],
+        )
+        for i in range(TITLES)
+    )
+    titles = list(Title.objects.order_by('pk'))
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genres[(title.pk + shift) % 30])
+        for title in titles for shift in (0, 7)
+    )
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'reader{i}', email=f'reader{i}@ya.fake')
+        for i in range(USERS)
+    )
+    users = list(django_user_model.objects.order_by('pk'))
+    Review.objects.bulk_create(
+        Review(title=title, author=user, text='Отзыв', score=5)
+        for title in titles[:REVIEWED_TITLES] for user in users
+    )
+    review = Review.objects.filter(title=titles[0]).first()
+    Comment.objects.bulk_create(
+        Comment(review=other, author=users[0], text='Комментарий')
+        for other in Review.objects.all()[:2000]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {
+        'title': titles[0], 'review': review,
+        'category': categories[3], 'genre': genres[5],
+    }
+
+
+def hot_endpoints(data):
+    title, review = data['title'], data['review']
+    base = f'/api/v1/titles/{title.id}'
+    endpoints = {
+        'reviews-list': f'{base}/reviews/',
+        'reviews-detail': f'{base}/reviews/{review.id}/',
+        'comments-list': f'{base}/reviews/{review.id}/comments/',
+        'titles-detail': f'{base}/',
+        'titles-by-year': '/api/v1/titles/?year=1950',
+        'titles-by-genre': f'/api/v1/titles/?genre={data["genre"].slug}',
+        'titles-by-category': (
+            f'/api/v1/titles/?category={data["category"].slug}'),
+    }
+    if connection.vendor == 'postgresql':
+        # Поиск по подстроке использует триграммный индекс только в PostgreSQL.
+        endpoints['titles-by-name'] = '/api/v1/titles/?name=ведение 12'
+    return endpoints
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}')
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [' '.join(map(str, row)) for row in cursor.fetchall()]
+
+
+def sequential_scans(plan):
+    if connection.vendor == 'postgresql':
+        pattern = r'Seq Scan on (\w+)'
+    else:
+        pattern = r'SCAN (?:TABLE )?(\w+)(?! USING)'
+    return [
+        table for line in plan
+        for table in re.findall(pattern, line) if table in LARGE_TABLES
+    ]
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def test_no_sequential_scans(self, client, large_dataset):
+        for endpoint, url in hot_endpoints(large_dataset).items():
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == 200
+            for query in context.captured_queries:
+                plan = explain(query['sql'])
+                assert not sequential_scans(plan), (
+                    f'{endpoint}: запрос читает таблицу целиком.\n'
+                    f'{query["sql"]}\n' + '\n'.join(plan)
+                )
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.checks import check_write_behind_cache
+from reviews.models import Review, ScoreDelta, Title, TitleStats
+from reviews.ratings import flush_score_deltas
+
+
+def refresh(title):
+    return Title.objects.get(pk=title.pk)
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_create_update_delete(self, title, user, another_user):
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10)
+        Review.objects.create(
+            title=title, author=another_user, text='Так себе', score=5)
+        title = refresh(title)
+        assert (title.reviews_count, title.score_sum) == (2, 15), (
+            'Проверьте, что счётчики отзывов растут при создании отзыва'
+        )
+        assert title.rating == 7.5
+
+        review.score = 2
+        review.save()
+        title = refresh(title)
+        assert (title.reviews_count, title.score_sum) == (2, 7), (
+            'Проверьте, что изменение оценки сдвигает сумму оценок'
+        )
+
+        review.delete()
+        title = refresh(title)
+        assert (title.reviews_count, title.score_sum, title.rating) == (
+            1, 5, 5.0
+        ), 'Проверьте, что удаление отзыва уменьшает счётчики'
+
+        Review.objects.all().delete()
+        title = refresh(title)
+        assert title.rating is None and title.reviews_count == 0
+
+    def test_move_review_to_other_title(self, title, user, category):
+        other = Title.objects.create(name='Крестный отец', year=1972)
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=8)
+        review.title = other
+        review.save()
+        assert refresh(title).reviews_count == 0
+        assert refresh(other).rating == 8.0
+
+    def test_rebuild_command(self, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='a', score=4)
+        Review.objects.create(
+            title=title, author=another_user, text='b', score=9)
+        Title.objects.update(rating=None, reviews_count=0, score_sum=0)
+        call_command('rebuild_ratings', stdout=StringIO())
+        title = refresh(title)
+        assert (title.reviews_count, title.score_sum, title.rating) == (
+            2, 13, 6.5
+        ), 'Проверьте, что команда rebuild_ratings пересчитывает рейтинг'
+
+    def test_titles_endpoint_reads_stored_rating(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='a', score=7)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['results'][0]['rating'] == 7
+
+
+@pytest.mark.django_db
+class TestWriteBehind:
+
+    @pytest.fixture(autouse=True)
+    def write_behind(self, settings):
+        settings.RATING_WRITE_BEHIND = True
+
+    def test_flush_coalesces_deltas(self, title, user, another_user):
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10)
+        Review.objects.create(
+            title=title, author=another_user, text='Так себе', score=5)
+        review.score = 2
+        review.save()
+        assert refresh(title).reviews_count == 0, (
+            'Проверьте, что в режиме write-behind отзыв не трогает строку '
+            'произведения'
+        )
+        assert ScoreDelta.objects.count() == 4
+        out = StringIO()
+        call_command('flush_score_deltas', '--once', stdout=out)
+        assert 'Применено оценок: 4' in out.getvalue()
+        title = refresh(title)
+        assert (title.reviews_count, title.score_sum, title.rating) == (
+            2, 7, 3.5
+        ), 'Проверьте, что воркер применяет накопленные оценки'
+        assert TitleStats.objects.get(title=title).histogram()[2] == 1
+        assert not ScoreDelta.objects.exists()
+        review.delete()
+        assert flush_score_deltas() == 1
+        assert refresh(title).rating == 5.0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_bounded_staleness(self, client, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='a', score=4)
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['rating'] is None
+        ScoreDelta.objects.update(
+            created=timezone.now() - timedelta(minutes=5))
+        Review.objects.create(
+            title=title, author=another_user, text='b', score=10)
+        assert client.get(url).json()['rating'] == 4.0, (
+            'Проверьте, что рейтинг в ответе не старше RATING_MAX_STALENESS'
+        )
+        assert ScoreDelta.objects.count() == 1
+        flush_score_deltas()
+        assert client.get(url).json()['rating'] == 7.0, (
+            'Проверьте, что после применения оценок кэш произведения сброшен'
+        )
+
+    def test_rebuild_discards_pending_deltas(self, title, user):
+        Review.objects.create(title=title, author=user, text='a', score=8)
+        assert ScoreDelta.objects.count() == 1
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert not ScoreDelta.objects.exists()
+        assert flush_score_deltas() == 0
+        title = refresh(title)
+        assert (title.reviews_count, title.score_sum) == (1, 8), (
+            'Проверьте, что пересчёт поглощает отложенные оценки и они '
+            'не учитываются второй раз'
+        )
+        assert TitleStats.objects.get(title=title).histogram()[8] == 1
+
+    @pytest.mark.django_db(
+        transaction=True, databases=['default', 'replica'])
+    def test_staleness_is_checked_on_primary(self, client, settings, title,
+                                             user):
+        settings.REPLICA_DATABASES = ['replica']
+        Review.objects.create(title=title, author=user, text='a', score=6)
+        ScoreDelta.objects.update(
+            created=timezone.now() - timedelta(minutes=5))
+        client.get('/api/v1/titles/')
+        assert not ScoreDelta.objects.exists(), (
+            'Проверьте, что отложенные оценки ищутся на основной базе, '
+            'а не на реплике'
+        )
+        assert refresh(title).rating == 6.0
+
+
+def test_write_behind_requires_shared_cache(settings):
+    settings.RATING_WRITE_BEHIND = True
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert [error.id for error in check_write_behind_cache(None)] == [
+        'api.E002'
+    ], 'Проверьте, что write-behind без общего кэша не проходит проверку'
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+    }}
+    assert check_write_behind_cache(None) == []
+    settings.RATING_WRITE_BEHIND = False
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert check_write_behind_cache(None) == []
@@ -0,0 +1,102 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from api.checks import check_replica_cache
+from api.replicas import RECENT_WRITE_KEY, ReplicaReadsMixin
+from api_yamdb.db.router import (read_database, read_from_primary,
+                                 read_from_replica)
+from reviews.models import Categories
+
+URL = '/api/v1/categories/'
+
+
+class FailingView(ReplicaReadsMixin, APIView):
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request):
+        assert read_database() == 'replica'
+        raise RuntimeError('сбой во вьюхе')
+
+
+def slugs(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    return {category['slug'] for category in response.json()['results']}
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class TestReplicaReads:
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.REPLICA_DATABASES = ['replica']
+        yield
+        read_from_primary()
+
+    def test_safe_requests_read_replica(self, client, user_client, category):
+        Categories.objects.using('replica').create(
+            name='Только на реплике', slug='replica-only')
+        assert slugs(client) == {'replica-only'}, (
+            'Проверьте, что GET каталога читает с реплики'
+        )
+        assert slugs(user_client) == {'replica-only'}, (
+            'Проверьте, что пользователь аутентифицируется по основной базе'
+        )
+
+    def test_writes_and_read_your_writes(self, admin, admin_client, client):
+        response = admin_client.post(
+            URL, {'name': 'Новая', 'slug': 'new'}, format='json')
+        assert response.status_code == 201
+        assert Categories.objects.using('default').filter(
+            slug='new').exists()
+        assert not Categories.objects.using('replica').exists(), (
+            'Проверьте, что запись идёт в основную базу'
+        )
+        assert slugs(admin_client) == {'new'}, (
+            'Проверьте, что после своей записи пользователь читает '
+            'с основной базы'
+        )
+        assert slugs(client) == set()
+        cache.delete(RECENT_WRITE_KEY.format(admin.pk))
+        assert slugs(admin_client) == set(), (
+            'Проверьте, что окно read-your-writes ограничено по времени'
+        )
+
+    def test_transactions_use_primary(self):
+        read_from_replica()
+        assert read_database() == 'replica'
+        with transaction.atomic():
+            assert read_database() == 'default', (
+                'Проверьте, что чтения внутри транзакции идут '
+                'в основную базу'
+            )
+
+    def test_failing_view_returns_to_primary(self):
+        view = FailingView.as_view()
+        with pytest.raises(RuntimeError):
+            view(APIRequestFactory().get('/'))
+        assert read_database() == 'default', (
+            'Проверьте, что после исключения во вьюхе поток '
+            'возвращается на основную базу'
+        )
+
+    def test_shared_cache_is_required(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        assert [error.id for error in check_replica_cache(None)] == [
+            'api.E001'
+        ], 'Проверьте, что реплики без общего кэша не проходят проверку'
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        }}
+        assert check_replica_cache(None) == []
+        settings.REPLICA_DATABASES = []
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        assert check_replica_cache(None) == []
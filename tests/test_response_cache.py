@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import cache_stats
+from reviews.models import Genres, Review
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCatalogResponseCache:
+
+    def test_titles_list_is_cached_until_review(self, client, title, user):
+        url = '/api/v1/titles/?genre=drama&year=1994'
+        assert client.get(url)['X-Cache'] == 'MISS'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?year=1994&genre=drama')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что порядок параметров запроса не влияет на ключ кэша'
+        )
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что ответ из кэша не обращается к БД'
+        )
+
+        Review.objects.create(title=title, author=user, text='a', score=9)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш списка произведений'
+        )
+        assert response.json()['results'][0]['rating'] == 9
+
+    def test_genres_version_is_independent(self, client, title, category):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/categories/')
+        Genres.objects.create(name='Комедия', slug='comedy')
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/categories/')['X-Cache'] == 'HIT'
+
+    def test_title_genres_change_invalidates(self, client, title):
+        client.get(f'/api/v1/titles/{title.id}/')
+        title.genre.clear()
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['genre'] == []
+
+    def test_hit_and_miss_counters(self, client, title):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        assert cache_stats() == {'hit': 2, 'miss': 1}
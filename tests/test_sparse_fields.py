@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response.json(), [query['sql'] for query in context.captured_queries]
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_without_params_unchanged(self, client, title):
+        data, _ = get(client, '/api/v1/titles/')
+        assert set(data['results'][0]) == {
+            'id', 'name', 'year', 'rating', 'description', 'genre',
+            'category',
+        }
+
+    def test_titles_fields_prune_sql(self, client, title):
+        data, queries = get(client, '/api/v1/titles/?fields=id,name,rating')
+        assert data['results'] == [
+            {'id': title.id, 'name': title.name, 'rating': None}
+        ]
+        title_queries = [sql for sql in queries if 'reviews_genres' in sql]
+        assert title_queries == [], (
+            'Проверьте, что жанры не подгружаются, если их не запросили'
+        )
+        select = next(sql for sql in queries
+                      if 'LIMIT' in sql and 'reviews_title' in sql)
+        assert 'description' not in select
+        assert 'reviews_categories' not in select
+
+    def test_titles_compact_and_expanded_relations(self, client, title):
+        data, _ = get(client, '/api/v1/titles/?fields=name,genre,category')
+        assert data['results'][0] == {
+            'name': title.name, 'genre': ['drama'], 'category': 'movie',
+        }, 'Проверьте, что без expand связи отдаются слагами'
+        data, _ = get(
+            client, f'/api/v1/titles/{title.id}/?fields=name&expand=genre')
+        assert data == {
+            'name': title.name,
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+        }
+
+    def test_unknown_fields_rejected(self, client, title):
+        response = client.get('/api/v1/titles/?fields=name,secret')
+        assert response.status_code == 400
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?expand=author')
+        assert response.status_code == 400
+
+    def test_reviews_fields(self, client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=7)
+        data, queries = get(
+            client, f'/api/v1/titles/{title.id}/reviews/?fields=id,score')
+        assert data['results'] == [{'id': review.id, 'score': 7}]
+        select = next(sql for sql in queries
+                      if 'LIMIT' in sql and 'reviews_review' in sql)
+        assert 'reviews_user' not in select, (
+            'Проверьте, что автор не подгружается, если его не запросили'
+        )
+        data, _ = get(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?fields=author',
+        )
+        assert data['results'] == []
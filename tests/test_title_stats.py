@@ -0,0 +1,144 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.checks import check_title_stats_half_life
+from reviews.models import Review, Title, TitleStats
+
+
+def stats_url(title):
+    return f'/api/v1/titles/{title.id}/stats/'
+
+
+def histogram(**scores):
+    result = {str(score): 0 for score in range(1, 11)}
+    result.update(scores)
+    return result
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_endpoint(self, client, title, user, another_user, admin):
+        Review.objects.create(title=title, author=user, text='a', score=2)
+        Review.objects.create(
+            title=title, author=another_user, text='b', score=8)
+        Review.objects.create(title=title, author=admin, text='c', score=9)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(stats_url(title))
+        assert response.status_code == 200
+        data = response.json()
+        assert (data['count'], data['mean'], data['median']) == (
+            3, 6.33, 8.0
+        ), 'Проверьте, что /stats/ отдаёт число отзывов, среднее и медиану'
+        assert data['histogram'] == histogram(**{'2': 1, '8': 1, '9': 1})
+        assert data['recent_mean'] is not None
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что статистика читается из готовой строки, '
+            'без агрегатов по отзывам'
+        )
+
+    def test_follows_review_changes(self, client, title, user, another_user):
+        other = Title.objects.create(name='Крестный отец', year=1972)
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=4)
+        Review.objects.create(
+            title=title, author=another_user, text='b', score=7)
+        review.score = 10
+        review.save()
+        assert client.get(stats_url(title)).json()['histogram'] == histogram(
+            **{'7': 1, '10': 1}
+        ), 'Проверьте, что изменение оценки переносит её в другой столбец'
+
+        review.title = other
+        review.save()
+        assert client.get(stats_url(title)).json()['count'] == 1
+        assert client.get(stats_url(other)).json()['histogram'] == histogram(
+            **{'10': 1}
+        )
+
+        Review.objects.all().delete()
+        data = client.get(stats_url(title)).json()
+        assert (data['count'], data['mean'], data['median'],
+                data['recent_mean'], data['trend']) == (
+            0, None, None, None, None
+        ), 'Проверьте, что удаление отзывов обнуляет статистику'
+
+    def test_recent_reviews_weigh_more(self, title, user, another_user):
+        old = Review.objects.create(
+            title=title, author=user, text='old', score=2)
+        Review.objects.create(
+            title=title, author=another_user, text='new', score=10)
+        Review.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=365))
+        call_command('rebuild_ratings', stdout=StringIO())
+        stats = TitleStats.objects.get(title=title)
+        assert stats.mean == 6
+        assert stats.recent_mean > 9.9, (
+            'Проверьте, что свежие отзывы весят в recent_mean больше старых'
+        )
+
+        Review.objects.filter(pk=old.pk).delete()
+        stats = TitleStats.objects.get(title=title)
+        assert stats.recent_mean == pytest.approx(10)
+
+    def test_missing_row_is_rebuilt(self, client, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='a', score=5)
+        TitleStats.objects.all().delete()
+        assert client.get(stats_url(title)).json()['count'] == 0
+        Review.objects.create(
+            title=title, author=another_user, text='b', score=6)
+        assert client.get(stats_url(title)).json()['histogram'] == histogram(
+            **{'5': 1, '6': 1}
+        ), 'Проверьте, что пропавшая строка статистики строится по отзывам'
+
+        url = stats_url(title)
+        title.delete()
+        assert not TitleStats.objects.exists()
+        assert client.get(url).status_code == 404
+
+    def test_batch_create(self, user_client, title):
+        response = user_client.post(
+            '/api/v1/batch/reviews/',
+            {'items': [{'title': title.id, 'text': 'a', 'score': 3}]},
+            format='json',
+        )
+        assert response.status_code == 200
+        assert user_client.get(stats_url(title)).json()['histogram'] == (
+            histogram(**{'3': 1})
+        ), 'Проверьте, что пакетное создание отзывов обновляет статистику'
+
+    def test_short_half_life_and_removal(self, settings, title, user,
+                                         another_user, django_user_model):
+        settings.TITLE_STATS_HALF_LIFE_DAYS = 0.5
+        old = Review.objects.create(
+            title=title, author=user, text='old', score=2)
+        Review.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=3))
+        call_command('rebuild_ratings', stdout=StringIO())
+        fresh = Review.objects.create(
+            title=title, author=another_user, text='new', score=10)
+        assert TitleStats.objects.get(title=title).recent_mean == (
+            pytest.approx(10, abs=0.2)
+        ), 'Проверьте, что короткий период полураспада не переполняет веса'
+        fresh.delete()
+        assert TitleStats.objects.get(title=title).recent_mean == (
+            pytest.approx(2)
+        ), 'Проверьте, что удаление свежего отзыва не теряет точность'
+
+    def test_half_life_is_validated(self, settings):
+        assert check_title_stats_half_life(None) == []
+        for value in (0, -1, float('inf'), '30'):
+            settings.TITLE_STATS_HALF_LIFE_DAYS = value
+            errors = check_title_stats_half_life(None)
+            assert [error.id for error in errors] == ['reviews.E001'], (
+                f'Проверьте, что период полураспада {value!r} отклоняется'
+            )
+
+    def test_bad_title_id(self, client):
+        assert client.get('/api/v1/titles/abc/stats/').status_code == 404